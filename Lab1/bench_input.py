@@ -0,0 +1,97 @@
+# bench_input.py
+# Wake-ups per second and press-to-reaction latency for each button
+# strategy in button_input.py, using a simulated (bouncing) button.
+#
+#   python3 bench_input.py [seconds_per_phase]
+#
+# Each strategy gets an idle phase (no presses) and an active phase (a press
+# every 0.3-0.8 s, each with a few ms of contact bounce).
+
+import random
+import sys
+import threading
+import time
+
+import labpath  # noqa: F401
+from button_input import make_button, STRATEGIES
+from hwsim import SimGPIO
+
+
+BUTTON = 5
+
+
+def presser(gpio, stop, press_times, seed=462):
+    rng = random.Random(seed)
+    while not stop.wait(rng.uniform(0.3, 0.8)):
+        press_times.append(time.monotonic())
+        # contact bounce on the way down
+        for _ in range(rng.randint(1, 4)):
+            gpio.press(BUTTON)
+            time.sleep(0.0005)
+            gpio.release(BUTTON)
+            time.sleep(0.0005)
+        gpio.press(BUTTON)
+        time.sleep(rng.uniform(0.05, 0.15))
+        gpio.release(BUTTON)
+
+
+def percentile(xs, p):
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))]
+
+
+def run_strategy(mode, seconds):
+    gpio = SimGPIO()
+    gpio.setup(BUTTON, gpio.IN, pull_up_down=gpio.PUD_DOWN)
+    button = make_button(mode, gpio, BUTTON, debounce=0.02, cooldown=0.0)
+
+    # idle phase
+    t0 = time.monotonic()
+    w0 = button.strategy.wakeups
+    while time.monotonic() - t0 < seconds:
+        button.wait(0.5)
+    idle_rate = (button.strategy.wakeups - w0) / (time.monotonic() - t0)
+
+    # active phase
+    stop = threading.Event()
+    press_times = []
+    th = threading.Thread(target=presser, args=(gpio, stop, press_times), daemon=True)
+    latencies = []
+    t0 = time.monotonic()
+    w0 = button.strategy.wakeups
+    th.start()
+    while time.monotonic() - t0 < seconds:
+        t = button.wait(0.5)
+        if t is not None and press_times:
+            latencies.append(time.monotonic() - press_times[-1])
+    stop.set()
+    th.join()
+    active_rate = (button.strategy.wakeups - w0) / (time.monotonic() - t0)
+
+    return {
+        "mode": mode,
+        "idle_wakeups_per_s": idle_rate,
+        "active_wakeups_per_s": active_rate,
+        "presses": len(press_times),
+        "detected": len(latencies),
+        "lat_mean_ms": 1e3 * sum(latencies) / len(latencies) if latencies else 0.0,
+        "lat_p95_ms": 1e3 * percentile(latencies, 0.95),
+        "lat_max_ms": 1e3 * max(latencies) if latencies else 0.0,
+    }
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'mode':9s} {'idle wk/s':>9s} {'active wk/s':>11s} {'presses':>7s} "
+          f"{'seen':>5s} {'lat mean':>9s} {'p95':>7s} {'max':>7s}")
+    for mode in STRATEGIES:
+        r = run_strategy(mode, seconds)
+        print(f"{r['mode']:9s} {r['idle_wakeups_per_s']:9.1f} {r['active_wakeups_per_s']:11.1f} "
+              f"{r['presses']:7d} {r['detected']:5d} {r['lat_mean_ms']:7.2f}ms "
+              f"{r['lat_p95_ms']:5.2f}ms {r['lat_max_ms']:5.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
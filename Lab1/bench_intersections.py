@@ -0,0 +1,96 @@
+# bench_intersections.py
+# How many independent intersections can one core drive on one asyncio loop
+# while keeping every light / 7-seg transition within TOLERANCE of its
+# deadline? Uses the simulated GPIO backend.
+#
+#   python3 bench_intersections.py [tolerance_ms] [seconds_per_step]
+#
+# Every intersection runs the real (11.5 s) sequence back to back, starting
+# at a random point in it so transitions are spread out like independent
+# intersections would be. N doubles until any transition is more than the
+# tolerance late (the "late" column); p99 is shown but doesn't decide.
+
+import asyncio
+import random
+import sys
+import time
+
+import labpath  # noqa: F401
+from hwsim import SimGPIO
+from intersections import Intersection, lateness_summary, sim_configs
+from metrics import LoopMetrics, Registry
+
+
+TOLERANCE = 0.005   # s
+SECONDS = 3.0       # measured per N
+WARMUP = 0.5        # s, ignored (all tasks starting at once)
+START_N = 25
+MAX_N = 25600
+
+
+async def trial(n, seconds, tolerance, seed=462):
+    rng = random.Random(seed)
+    gpio = SimGPIO()
+    # private registry: one shared loop for all N, not N exported ones
+    registry = Registry()
+    warm = LoopMetrics("bench_warmup", registry=registry)
+    stats = LoopMetrics("bench", tolerance=tolerance, registry=registry)
+    loop = asyncio.get_running_loop()
+
+    def again(x):
+        loop.call_soon(x.press)
+
+    xs = [Intersection(cfg, gpio, cooldown=0.0, metrics=warm, on_done=again)
+          for cfg in sim_configs(n)]
+    for x in xs:
+        x.setup()
+    tasks = [asyncio.create_task(x.run()) for x in xs]
+    await asyncio.sleep(0)
+
+    duration = xs[0].steps[-1][0]
+    now = time.monotonic()
+    for x in xs:
+        x.press(t0=now - rng.uniform(0.0, duration))
+
+    await asyncio.sleep(WARMUP)
+    for x in xs:
+        x.metrics = stats
+    c0 = time.process_time()
+    w0 = time.monotonic()
+    await asyncio.sleep(seconds)
+    cpu = (time.process_time() - c0) / (time.monotonic() - w0)
+
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    out = lateness_summary(stats)
+    out["n"] = n
+    out["transitions_per_s"] = stats.lateness.count / seconds
+    out["cpu"] = cpu
+    return out
+
+
+def main():
+    tolerance = float(sys.argv[1]) / 1e3 if len(sys.argv) > 1 else TOLERANCE
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else SECONDS
+
+    print(f"tolerance {1e3 * tolerance:.1f} ms (every transition), {seconds:.1f} s per step")
+    print(f"{'N':>6s} {'trans/s':>9s} {'p50':>8s} {'p99':>8s} {'max':>8s} {'late':>6s} {'cpu':>5s}")
+    best = 0
+    n = START_N
+    while n <= MAX_N:
+        r = asyncio.run(trial(n, seconds, tolerance))
+        ok = r["over_tolerance"] == 0
+        print(f"{n:6d} {r['transitions_per_s']:9.0f} {r['p50_ms']:6.2f}ms {r['p99_ms']:6.2f}ms "
+              f"{r['max_ms']:6.2f}ms {r['over_tolerance']:6d} {100 * r['cpu']:4.0f}%"
+              f"{'' if ok else '  <- over tolerance'}")
+        if not ok:
+            break
+        best = n
+        n *= 2
+    print(f"\none core: {best} intersections with every transition within {1e3 * tolerance:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench_outputs.py
+# GPIO call count + update latency of one full button sequence:
+# the old per-pin writes (clear all, then set each pin) vs OutputBank.
+#
+# No hardware needed: GPIO is replaced by a counter so only the Python side
+# is timed. On the Pi each GPIO.output call also costs a syscall, so the
+# call count is the number that matters.
+#   python3 bench_outputs.py
+
+import time
+
+from outputs import DIGITS, LAB1_CONFIG, config_outputs
+from sequencer import build_steps
+
+
+CFG = LAB1_CONFIG
+
+
+class CountingGPIO:
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self):
+        self.calls = 0
+        self.pins_written = 0
+
+    def output(self, chans, levels):
+        self.calls += 1
+        self.pins_written += len(chans) if isinstance(chans, (list, tuple)) else 1
+
+
+def naive_outputs(gpio):
+    """The original set_rgb / clear_7seg / show_digit."""
+    def set_rgb(r_pin, g_pin, b_pin, color):
+        gpio.output(r_pin, gpio.LOW)
+        gpio.output(g_pin, gpio.LOW)
+        gpio.output(b_pin, gpio.LOW)
+        if color == "red":
+            gpio.output(r_pin, gpio.HIGH)
+        elif color == "green":
+            gpio.output(g_pin, gpio.HIGH)
+        elif color == "blue":
+            gpio.output(b_pin, gpio.HIGH)
+
+    def clear_7seg():
+        for pin in CFG.seg_pins.values():
+            gpio.output(pin, gpio.LOW)
+
+    def show_digit(d):
+        clear_7seg()
+        for seg in DIGITS.get(d, []):
+            gpio.output(CFG.seg_pins[seg], gpio.HIGH)
+
+    return {
+        "l1": lambda c: set_rgb(*CFG.l1, c),
+        "l2": lambda c: set_rgb(*CFG.l2, c),
+        "digit": show_digit,
+        "clear": clear_7seg,
+    }
+
+
+def bank_outputs(gpio):
+    bank, l1, l2, seg = config_outputs(gpio, CFG)
+    return {
+        "l1": l1.set,
+        "l2": l2.set,
+        "digit": seg.set,
+        "clear": lambda: seg.set(None),
+    }, bank
+
+
+def replay(outputs, steps, repeats):
+    n = 0
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        outputs["l1"]("red")
+        outputs["l2"]("green")
+        for _, _, action, arg in steps:
+            if action == "clear":
+                outputs["clear"]()
+            else:
+                outputs[action](arg)
+            n += 1
+    return n + 2 * repeats, time.perf_counter() - t0
+
+
+def main(repeats=200):
+    steps = build_steps()
+
+    g = CountingGPIO()
+    n, dt = replay(naive_outputs(g), steps, repeats)
+    print(f"per-pin : {g.calls / repeats:6.1f} GPIO calls/sequence, "
+          f"{g.pins_written / repeats:6.1f} pin writes/sequence, "
+          f"{1e6 * dt / n:5.2f} us/update")
+
+    g = CountingGPIO()
+    outputs, bank = bank_outputs(g)
+    n, dt = replay(outputs, steps, repeats)
+    st = bank.stats()
+    print(f"bitmask : {g.calls / repeats:6.1f} GPIO calls/sequence, "
+          f"{g.pins_written / repeats:6.1f} pin writes/sequence, "
+          f"{1e6 * dt / n:5.2f} us/update "
+          f"({st['skipped']} of {st['requests']} updates needed no write)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# button_input.py
+# Button acquisition for Lab 1 with selectable strategies:
+#
+#   FixedPoll     read the pin every `interval` s (the original 10 ms loop)
+#   AdaptivePoll  poll fast right after activity, back off towards `slow`
+#                 while idle, so an idle controller wakes ~20x/s, not 100x/s
+#   EdgeWait      block in GPIO.wait_for_edge() until a rising edge or the
+#                 timeout; the process sleeps in the kernel while idle
+#
+# All strategies report rising edges stamped with time.monotonic(); a shared
+# PressFilter applies debounce + cooldown so they behave identically.
+# bench_input.py compares wake-ups/s and press-to-reaction latency.
+
+import time
+
+
+class PressFilter:
+    """Debounce (ignore edges closer than `debounce` s to the previous edge)
+    and cooldown (ignore presses within `cooldown` s of the last accepted one)."""
+
+    def __init__(self, debounce=0.2, cooldown=20.0):
+        self.debounce = debounce
+        self.cooldown = cooldown
+        self.last_edge = -1e9
+        self.last_press = -1e9
+        self.accepted = 0
+        self.bounced = 0
+        self.cooling = 0
+
+    def accept(self, t):
+        if t - self.last_edge < self.debounce:
+            self.last_edge = t
+            self.bounced += 1
+            return False
+        self.last_edge = t
+        if t - self.last_press < self.cooldown:
+            self.cooling += 1
+            return False
+        self.last_press = t
+        self.accepted += 1
+        return True
+
+
+class FixedPoll:
+    name = "fixed"
+
+    def __init__(self, gpio, pin, interval=0.01):
+        self.gpio = gpio
+        self.pin = pin
+        self.interval = interval
+        self.wakeups = 0
+        self._prev = gpio.LOW
+
+    def _read(self):
+        self.wakeups += 1
+        level = self.gpio.input(self.pin)
+        rising = level == self.gpio.HIGH and self._prev != self.gpio.HIGH
+        self._prev = level
+        return rising
+
+    def wait_edge(self, timeout):
+        """Return the monotonic time of the next rising edge, or None once
+        `timeout` s have passed without one."""
+        end = time.monotonic() + timeout
+        while True:
+            if self._read():
+                return time.monotonic()
+            now = time.monotonic()
+            if now >= end:
+                return None
+            time.sleep(min(self.interval, end - now))
+
+
+class AdaptivePoll(FixedPoll):
+    name = "adaptive"
+
+    def __init__(self, gpio, pin, fast=0.002, slow=0.05, backoff=1.25, hold=1.0):
+        super().__init__(gpio, pin, fast)
+        self.fast = fast
+        self.slow = slow
+        self.backoff = backoff
+        self.hold = hold
+        self._last_active = -1e9
+
+    def _read(self):
+        rising = super()._read()
+        now = time.monotonic()
+        if self._prev == self.gpio.HIGH:
+            self._last_active = now
+        if now - self._last_active < self.hold:
+            # recent activity: stay fast so bounces/next press are seen quickly
+            self.interval = self.fast
+        else:
+            self.interval = min(self.slow, self.interval * self.backoff)
+        return rising
+
+
+class EdgeWait:
+    name = "edge"
+
+    def __init__(self, gpio, pin, bouncetime=None):
+        self.gpio = gpio
+        self.pin = pin
+        self.bouncetime = bouncetime
+        self.wakeups = 0
+
+    def wait_edge(self, timeout):
+        kwargs = {"timeout": max(1, int(timeout * 1000))}
+        if self.bouncetime:
+            kwargs["bouncetime"] = self.bouncetime
+        ch = self.gpio.wait_for_edge(self.pin, self.gpio.RISING, **kwargs)
+        self.wakeups += 1
+        return time.monotonic() if ch is not None else None
+
+
+STRATEGIES = {
+    "fixed": FixedPoll,
+    "adaptive": AdaptivePoll,
+    "edge": EdgeWait,
+}
+
+
+class ButtonInput:
+    """strategy + filter. wait(timeout) returns the monotonic time of an
+    accepted press, or None if none arrived within `timeout` s."""
+
+    def __init__(self, strategy, press_filter):
+        self.strategy = strategy
+        self.filter = press_filter
+        self.edges = 0
+        self._t_start = time.monotonic()
+
+    def wait(self, timeout):
+        end = time.monotonic() + timeout
+        while True:
+            left = end - time.monotonic()
+            if left <= 0:
+                return None
+            t = self.strategy.wait_edge(left)
+            if t is None:
+                return None
+            self.edges += 1
+            if self.filter.accept(t):
+                return t
+
+    def stats(self):
+        elapsed = max(1e-9, time.monotonic() - self._t_start)
+        return {
+            "mode": self.strategy.name,
+            "wakeups": self.strategy.wakeups,
+            "wakeups_per_s": self.strategy.wakeups / elapsed,
+            "edges": self.edges,
+            "accepted": self.filter.accepted,
+            "bounced": self.filter.bounced,
+            "cooldown": self.filter.cooling,
+        }
+
+
+def make_button(mode, gpio, pin, debounce=0.2, cooldown=20.0, **kwargs):
+    return ButtonInput(STRATEGIES[mode](gpio, pin, **kwargs),
+                       PressFilter(debounce, cooldown))
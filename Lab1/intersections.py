@@ -0,0 +1,191 @@
+# intersections.py
+# Many Lab 1 intersections in one process on one asyncio event loop.
+#
+# Every intersection is wired per an IntersectionConfig (outputs.py; the
+# single-intersection scripts use LAB1_CONFIG). Each intersection is one
+# asyncio task that waits for its button, then walks the same timeline as
+# sequencer.build_steps(), sleeping until each absolute deadline. Outputs go
+# through an OutputBank per intersection (diffed, batched writes). Each
+# intersection's lateness and GPIO time go to LoopMetrics("lab1_<name>"),
+# exported like the other labs' loops (LAB_METRICS_FILE, see metrics/).
+#
+# Run on the Pi (uses INTERSECTIONS below):
+#   python3 intersections.py
+# Capacity benchmark on the simulated GPIO: bench_intersections.py
+
+import asyncio
+import time
+
+import labpath  # noqa: F401
+from metrics import LoopMetrics, setup_from_env
+from outputs import IntersectionConfig, LAB1_CONFIG, SEG_ORDER, config_outputs
+from sequencer import build_steps
+
+
+INTERSECTIONS = [LAB1_CONFIG]
+
+COOLDOWN = 20.0
+TOLERANCE = 0.005   # s a transition may be late before it counts as a miss
+
+
+def sim_configs(n, first_pin=1000):
+    """n non-overlapping pin maps for the simulated backend (15 pins each)."""
+    configs = []
+    pin = first_pin
+    for i in range(n):
+        configs.append(IntersectionConfig(
+            name=f"x{i}",
+            l1=(pin, pin + 1, pin + 2),
+            l2=(pin + 3, pin + 4, pin + 5),
+            button=pin + 6,
+            seg_pins={s: pin + 7 + j for j, s in enumerate(SEG_ORDER)},
+        ))
+        pin += 15
+    return configs
+
+
+def lateness_summary(metrics):
+    """Transition lateness of a LoopMetrics as {n, p50_ms, p99_ms, max_ms,
+    over_tolerance}."""
+    h = metrics.lateness
+    return {
+        "n": h.count,
+        "p50_ms": 1e3 * h.percentile(50),
+        "p99_ms": 1e3 * h.percentile(99),
+        "max_ms": 1e3 * h.max,
+        "over_tolerance": metrics.misses.value,
+    }
+
+
+class Intersection:
+    """
+    metrics: LoopMetrics for the transitions (default lab1_<config.name>);
+    a benchmark can share one between many intersections.
+    """
+
+    def __init__(self, config, gpio, steps=None, cooldown=COOLDOWN, metrics=None,
+                 on_done=None):
+        self.config = config
+        self.gpio = gpio
+        self.steps = steps if steps is not None else build_steps()
+        self.cooldown = cooldown
+        if metrics is None:
+            metrics = LoopMetrics(f"lab1_{config.name}", tolerance=TOLERANCE)
+        self.metrics = metrics
+        self.on_done = on_done
+
+        self.bank, l1, l2, seg = config_outputs(gpio, config, metrics=metrics)
+        self.outputs = {
+            "l1": l1.set,
+            "l2": l2.set,
+            "digit": seg.set,
+            "clear": lambda: seg.set(None),
+        }
+
+        self.phase = "idle"
+        self.runs = 0
+        self._pressed = None
+        self._t0 = None
+        self._last_press = -1e9
+
+    def setup(self):
+        gpio = self.gpio
+        for pin in self.bank.pins:
+            gpio.setup(pin, gpio.OUT, initial=gpio.LOW)
+        self.bank.reset()
+        gpio.setup(self.config.button, gpio.IN, pull_up_down=gpio.PUD_DOWN)
+        self.outputs["l1"]("red")
+        self.outputs["l2"]("green")
+
+    def press(self, t0=None):
+        """Request a sequence (call on the loop thread). t0 lets a benchmark
+        start mid-sequence; steps before now are applied immediately."""
+        if self._t0 is not None or self._pressed is None:
+            return False
+        now = time.monotonic()
+        if now - self._last_press < self.cooldown:
+            return False
+        self._last_press = now
+        self._t0 = now if t0 is None else t0
+        self._pressed.set()
+        return True
+
+    def state(self):
+        return {"name": self.config.name, "phase": self.phase,
+                "running": self._t0 is not None, "runs": self.runs}
+
+    async def run(self):
+        # asyncio's loop clock is time.monotonic, so deadlines compare directly
+        self._pressed = asyncio.Event()
+        outputs = self.outputs
+        while True:
+            await self._pressed.wait()
+            self._pressed.clear()
+            t0 = self._t0
+            woke = time.monotonic()
+            for off, phase, action, arg in self.steps:
+                deadline = t0 + off
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if deadline >= woke:
+                    # steps before the press (t0 in the past) don't count
+                    now = time.monotonic()
+                    self.metrics.tick(now)
+                    self.metrics.late(now - deadline)
+                self.phase = phase
+                if action == "clear":
+                    outputs["clear"]()
+                else:
+                    outputs[action](arg)
+            self.phase = "idle"
+            self.runs += 1
+            self._t0 = None
+            if self.on_done is not None:
+                self.on_done(self)
+
+
+def attach_buttons(loop, gpio, intersections):
+    """Route GPIO edge interrupts (a GPIO thread) onto the event loop."""
+    for x in intersections:
+        gpio.add_event_detect(
+            x.config.button, gpio.RISING,
+            callback=lambda ch, x=x: loop.call_soon_threadsafe(x.press),
+            bouncetime=200,
+        )
+
+
+async def main_async(gpio, configs):
+    loop = asyncio.get_running_loop()
+    intersections = [Intersection(cfg, gpio) for cfg in configs]
+    for x in intersections:
+        x.setup()
+    tasks = [asyncio.create_task(x.run(), name=x.config.name) for x in intersections]
+    await asyncio.sleep(0)   # let every task create its event
+    attach_buttons(loop, gpio, intersections)
+    print(f"running {len(intersections)} intersection(s)")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for t in tasks:
+            t.cancel()
+        for x in intersections:
+            print(x.config.name, x.state(), lateness_summary(x.metrics), x.bank.stats())
+
+
+def main():
+    import RPi.GPIO as GPIO
+
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setwarnings(False)
+    # the loop runs on this thread, so the default profiler target is right
+    instrumentation = setup_from_env()
+    try:
+        asyncio.run(main_async(GPIO, INTERSECTIONS))
+    finally:
+        instrumentation.stop()
+        GPIO.cleanup()
+
+
+if __name__ == "__main__":
+    main()
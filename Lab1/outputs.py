@@ -0,0 +1,177 @@
+# outputs.py
+# Diffed, batched GPIO output layer for Lab 1.
+#
+# Every output pin (both RGB lights + the 7-segment) is one bit in a single
+# integer. Digits and colours are precomputed bitmasks, so an update is:
+#   changed = (current ^ wanted) & pins_of_this_device
+# and only the changed pins are written, with one multi-pin
+# GPIO.output(list, list) call. Re-setting a colour that is already showing
+# costs no GPIO call at all.
+#
+# The bank counts requests / GPIO calls / pins written and times each update
+# so the saving over per-pin writes is visible (see stats()).
+#
+# The wiring of one intersection is an IntersectionConfig; LAB1_CONFIG is
+# the board used by both controllers, bench_outputs.py and intersections.py.
+
+import threading
+import time
+from collections import namedtuple
+
+
+SEG_ORDER = ("a", "b", "c", "d", "e", "f", "g", "dp")
+RGB_ORDER = ("red", "green", "blue")
+
+
+def segment_masks(digits, order=SEG_ORDER):
+    """{digit: mask} with bit i set if segment order[i] is lit."""
+    return {d: sum(1 << order.index(seg) for seg in segs) for d, segs in digits.items()}
+
+
+def color_masks(order=RGB_ORDER):
+    """{color: mask} over (r, g, b) pins; "off" is 0. Common cathode: HIGH = on."""
+    masks = {name: 1 << i for i, name in enumerate(order)}
+    masks["off"] = 0
+    return masks
+
+
+COLOR_MASKS = color_masks()
+
+# segments lit for each digit on the 7-seg
+DIGITS = {
+    0: ["a","b","c","d","e","f"],
+    1: ["b","c"],
+    2: ["a","b","d","e","g"],
+    3: ["a","b","c","d","g"],
+    4: ["b","c","f","g"],
+    5: ["a","c","d","f","g"],
+    6: ["a","c","d","e","f","g"],
+    7: ["a","b","c"],
+    8: ["a","b","c","d","e","f","g"],
+    9: ["a","b","c","d","f","g"],
+}
+DIGIT_MASKS = segment_masks(DIGITS)
+
+# l1/l2: (R, G, B) pins; button: pull-down input; seg_pins: {"a": pin, ..., "dp": pin}
+IntersectionConfig = namedtuple("IntersectionConfig", ["name", "l1", "l2", "button", "seg_pins"])
+
+# The Lab 1 wiring (BCM numbering); dp is wired but never lit
+LAB1_CONFIG = IntersectionConfig(
+    name="lab1",
+    l1=(17, 27, 22),
+    l2=(23, 24, 25),
+    button=5,
+    seg_pins={"a": 13, "b": 6, "c": 16, "d": 20, "e": 21, "f": 19, "g": 26, "dp": 12},
+)
+
+
+class OutputBank:
+    """All output pins as one bitfield; writes only what changed.
+
+    metrics: optional metrics.LoopMetrics; gets the time of each GPIO call."""
+
+    def __init__(self, gpio, pins, metrics=None):
+        self.gpio = gpio
+        self.metrics = metrics
+        self.pins = list(pins)
+        self._bit = {pin: 1 << i for i, pin in enumerate(self.pins)}
+        self._lock = threading.Lock()
+        self.state = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.requests = 0      # write() calls
+        self.skipped = 0       # requests that needed no GPIO call
+        self.calls = 0         # GPIO.output calls issued
+        self.pins_written = 0
+        self.time_total = 0.0  # s spent in write() incl. GPIO
+        self.time_max = 0.0
+
+    def mask_for(self, pins):
+        m = 0
+        for pin in pins:
+            m |= self._bit[pin]
+        return m
+
+    def expand(self, pins, local_mask):
+        """Map a mask over `pins` (bit i = pins[i]) to a bank-wide mask."""
+        m = 0
+        for i, pin in enumerate(pins):
+            if local_mask & (1 << i):
+                m |= self._bit[pin]
+        return m
+
+    def group(self, pins, table):
+        return OutputGroup(self, pins, table)
+
+    def reset(self):
+        """Drive every pin LOW and resync the cached state."""
+        with self._lock:
+            self.gpio.output(self.pins, [self.gpio.LOW] * len(self.pins))
+            self.calls += 1
+            self.pins_written += len(self.pins)
+            self.state = 0
+
+    def write(self, values, care):
+        t0 = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+            changed = (self.state ^ values) & care
+            if not changed:
+                self.skipped += 1
+            else:
+                chans = []
+                levels = []
+                high = self.gpio.HIGH
+                low = self.gpio.LOW
+                c = changed
+                while c:
+                    bit = c & -c
+                    c ^= bit
+                    chans.append(self.pins[bit.bit_length() - 1])
+                    levels.append(high if values & bit else low)
+                g0 = time.perf_counter()
+                self.gpio.output(chans, levels)
+                if self.metrics is not None:
+                    self.metrics.io(time.perf_counter() - g0)
+                self.calls += 1
+                self.pins_written += len(chans)
+                self.state = (self.state & ~care) | (values & care)
+            dt = time.perf_counter() - t0
+            self.time_total += dt
+            if dt > self.time_max:
+                self.time_max = dt
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "skipped": self.skipped,
+            "gpio_calls": self.calls,
+            "pins_written": self.pins_written,
+            "mean_update_us": 1e6 * self.time_total / self.requests if self.requests else 0.0,
+            "max_update_us": 1e6 * self.time_max,
+        }
+
+
+class OutputGroup:
+    """A device on the bank (one RGB light, the 7-seg) with a table of
+    named states -> masks. Unknown names turn the device off."""
+
+    def __init__(self, bank, pins, table):
+        self.bank = bank
+        self.care = bank.mask_for(pins)
+        self.table = {key: bank.expand(pins, m) for key, m in table.items()}
+
+    def set(self, key):
+        self.bank.write(self.table.get(key, 0), self.care)
+
+
+def config_outputs(gpio, config, metrics=None):
+    """OutputBank over all of config's output pins, plus its two lights and
+    the 7-seg as groups: (bank, l1, l2, seven_seg)."""
+    seg = [config.seg_pins[s] for s in SEG_ORDER]
+    bank = OutputBank(gpio, list(config.l1) + list(config.l2) + seg, metrics=metrics)
+    return (bank,
+            bank.group(config.l1, COLOR_MASKS),
+            bank.group(config.l2, COLOR_MASKS),
+            bank.group(seg, DIGIT_MASKS))
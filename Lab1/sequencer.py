@@ -0,0 +1,304 @@
+# sequencer.py
+# Non-blocking traffic light sequence for Lab 1.
+#
+# The old run_sequence() slept on the main thread for the whole ~11.5 s
+# blink + countdown. Here the sequence is a list of timed steps
+# (offset from start, phase, action) that a single Scheduler thread fires
+# at absolute deadlines, so:
+#   - nothing blocks the caller (button handling keeps running)
+#   - deadlines don't drift (each step is t0 + offset, not sleep after sleep)
+#   - a running sequence can be cancelled or queried at any time
+#   - lateness of every step is recorded
+
+import heapq
+import itertools
+import math
+import threading
+import time
+
+
+class Job:
+    __slots__ = ("deadline", "fn", "args", "cancelled")
+
+    def __init__(self, deadline, fn, args):
+        self.deadline = deadline
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimingStats:
+    """Lateness (actual - deadline) of fired jobs, in seconds."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.over_1ms = 0
+        self.over_5ms = 0
+
+    def add(self, late):
+        self.n += 1
+        self.total += late
+        if late > self.worst:
+            self.worst = late
+        if late > 0.001:
+            self.over_1ms += 1
+        if late > 0.005:
+            self.over_5ms += 1
+
+    def summary(self):
+        mean = self.total / self.n if self.n else 0.0
+        return {
+            "fired": self.n,
+            "mean_late_ms": 1e3 * mean,
+            "max_late_ms": 1e3 * self.worst,
+            "over_1ms": self.over_1ms,
+            "over_5ms": self.over_5ms,
+        }
+
+
+class Scheduler:
+    """
+    Heap of deadlines serviced by one thread. call_at() is safe from any
+    thread (including a GPIO interrupt callback) and returns a Job that can
+    be cancelled.
+
+    run_pending() can also be called directly instead of start(), e.g. to
+    drive the scheduler from another loop.
+
+    metrics: optional metrics.LoopMetrics; gets every job's lateness.
+    """
+
+    def __init__(self, clock=time.monotonic, metrics=None):
+        self.clock = clock
+        self.metrics = metrics
+        self.stats = TimingStats()
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def call_at(self, deadline, fn, *args):
+        job = Job(deadline, fn, args)
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._seq), job))
+            self._cond.notify()
+        return job
+
+    def call_later(self, delay, fn, *args):
+        return self.call_at(self.clock() + delay, fn, *args)
+
+    def next_deadline(self):
+        with self._cond:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def run_pending(self):
+        """Fire every job that is due. Returns the next deadline (or None)."""
+        while True:
+            with self._cond:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    return None
+                deadline, _, job = self._heap[0]
+                now = self.clock()
+                if deadline > now:
+                    return deadline
+                heapq.heappop(self._heap)
+            # run outside the lock so the job may schedule/cancel others
+            self.stats.add(now - deadline)
+            if self.metrics is not None:
+                self.metrics.tick(now)
+                self.metrics.late(now - deadline)
+            job.fn(*job.args)
+
+    def _loop(self):
+        while True:
+            nxt = self.run_pending()
+            with self._cond:
+                if not self._running:
+                    return
+                if self._heap and self._heap[0][0] != nxt:
+                    continue   # something earlier was added meanwhile
+                timeout = None if nxt is None else max(0.0, nxt - self.clock())
+                self._cond.wait(timeout)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    @property
+    def thread_id(self):
+        """Ident of the thread start() runs the jobs on (None if not started)."""
+        return self._thread.ident if self._thread is not None else None
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def build_steps(blink_times=3, on_time=0.25, off_time=0.25,
+                count_from=9, flash_at=4, digit_time=1.0, flash=0.2):
+    """
+    Timeline of the button sequence as [(offset_s, phase, action, arg)].
+    action is one of "l1", "l2" (set colour), "digit", "clear".
+
+      (b) TL2 blinks blue `blink_times` times, then red
+      (c) TL1 green while the 7-seg counts down from `count_from`
+      (d) at `flash_at` and below, TL1 flashes blue every 2*`flash`, on one
+          grid from the first flashing digit (so no long blue at digit
+          boundaries when `digit_time` isn't a multiple of 2*`flash`)
+      (e) at the end: 7-seg off, TL1 red, TL2 green
+    """
+    steps = []
+    t = 0.0
+    for _ in range(blink_times):
+        steps.append((t, "l2_blink", "l2", "blue"))
+        t += on_time
+        steps.append((t, "l2_blink", "l2", "off"))
+        t += off_time
+    steps.append((t, "countdown", "l2", "red"))
+    steps.append((t, "countdown", "l1", "green"))
+
+    flash_start = None
+    for n in range(count_from, -1, -1):
+        steps.append((t, "countdown", "digit", n))
+        if n > flash_at:
+            steps.append((t, "countdown", "l1", "green"))
+        else:
+            if flash_start is None:
+                flash_start = t
+            # even grid points are blue, odd ones off
+            m = math.ceil((t - flash_start) / flash - 1e-9)
+            while flash_start + m * flash < t + digit_time - 1e-9:
+                steps.append((flash_start + m * flash, "countdown", "l1",
+                              "blue" if m % 2 == 0 else "off"))
+                m += 1
+        t += digit_time
+
+    steps.append((t, "idle", "clear", None))
+    steps.append((t, "idle", "l1", "red"))
+    steps.append((t, "idle", "l2", "green"))
+    return steps
+
+
+class TrafficSequencer:
+    """
+    Timed state machine for the button sequence.
+
+    outputs: dict with callables "l1"(color), "l2"(color), "digit"(n),
+    "clear"(). start() schedules the whole timeline and returns at once;
+    state() / cancel() can be called from any thread while it runs.
+    """
+
+    def __init__(self, scheduler, outputs, steps=None, on_done=None):
+        self.scheduler = scheduler
+        self.outputs = outputs
+        self.steps = steps if steps is not None else build_steps()
+        self.on_done = on_done
+        self._lock = threading.Lock()
+        self._jobs = []
+        self._t0 = None
+        # bumped by every start/cancel/finish: a step the scheduler already
+        # popped when its run was cancelled sees a stale generation and is dropped
+        self._gen = 0
+        self.phase = "idle"
+        self.digit = None
+        self.runs = 0
+        self.cancelled = 0
+
+    @property
+    def running(self):
+        return self._t0 is not None
+
+    @property
+    def duration(self):
+        return self.steps[-1][0] if self.steps else 0.0
+
+    def start(self):
+        """Begin the sequence. Returns False if one is already running."""
+        with self._lock:
+            if self._t0 is not None:
+                return False
+            t0 = self._t0 = self.scheduler.clock()
+            self._gen += 1
+            gen = self._gen
+            self._jobs = [self.scheduler.call_at(t0 + off, self._do, gen, phase, action, arg)
+                          for off, phase, action, arg in self.steps]
+            self._jobs.append(self.scheduler.call_at(t0 + self.duration, self._finish, gen))
+            self.runs += 1
+        return True
+
+    def cancel(self, restore=True):
+        """Stop a running sequence; by default put the lights back to idle."""
+        with self._lock:
+            if self._t0 is None:
+                return False
+            for job in self._jobs:
+                job.cancel()
+            self._jobs = []
+            self._t0 = None
+            self._gen += 1
+            self.cancelled += 1
+            # under the lock, so no step of the cancelled run can land after this
+            if restore:
+                self.outputs["clear"]()
+                self.outputs["l1"]("red")
+                self.outputs["l2"]("green")
+            self.phase = "idle"
+            self.digit = None
+        return True
+
+    def state(self):
+        with self._lock:
+            t0 = self._t0
+        elapsed = self.scheduler.clock() - t0 if t0 is not None else 0.0
+        return {
+            "running": t0 is not None,
+            "phase": self.phase,
+            "digit": self.digit,
+            "elapsed": elapsed,
+            "remaining": max(0.0, self.duration - elapsed) if t0 is not None else 0.0,
+            "runs": self.runs,
+            "cancelled": self.cancelled,
+        }
+
+    def _do(self, gen, phase, action, arg):
+        with self._lock:
+            if gen != self._gen:
+                return
+            self.phase = phase
+            if action == "digit":
+                self.digit = arg
+                self.outputs["digit"](arg)
+            elif action == "clear":
+                self.digit = None
+                self.outputs["clear"]()
+            else:
+                self.outputs[action](arg)
+
+    def _finish(self, gen):
+        with self._lock:
+            if gen != self._gen:
+                return
+            self._jobs = []
+            self._t0 = None
+            self._gen += 1
+            self.phase = "idle"
+        if self.on_done is not None:
+            self.on_done()
@@ -2,129 +2,79 @@
 import time
 import threading
 import RPi.GPIO as GPIO
-#Pin mapping (BCM numbering)
-# Traffic Light RGB
-L1_R , L1_G, L1_B = 17, 27, 22
-L2_R, L2_G, L2_B = 23, 24, 25
-# Button with pull-down resistor
-BUTTON = 5
-# 7-segment segments a,b,c,d,e,f,g,dp
-SEG_PINS = {
-    "a": 13,
-    "b": 6,
-    "c": 16,
-    "d": 20,
-    "e": 21,
-    "f": 19,
-    "g": 26,
-    "dp": 12,   # optional, not used
-}
-DIGITS = {
-    0: ["a","b","c","d","e","f"],
-    1: ["b","c"],
-    2: ["a","b","d","e","g"],
-    3: ["a","b","c","d","g"],
-    4: ["b","c","f","g"],
-    5: ["a","c","d","f","g"],
-    6: ["a","c","d","e","f","g"],
-    7: ["a","b","c"],
-    8: ["a","b","c","d","e","f","g"],
-    9: ["a","b","c","d","f","g"],
-}
+
+import labpath  # noqa: F401
+from metrics import LoopMetrics, setup_from_env
+from outputs import LAB1_CONFIG, config_outputs
+from sequencer import Scheduler, TrafficSequencer, build_steps
+
+# Pin mapping (BCM numbering): see LAB1_CONFIG in outputs.py
+CONFIG = LAB1_CONFIG
+BUTTON = CONFIG.button
 COOLDOWN = 20
+STATUS_EVERY = 1.0
 # state
-press_event = threading.Event()
 state_lock = threading.Lock()
-last_valid_press_time = 0.0
+last_valid_press_time = -1e9
 sequence_running = False
 
 
+# OUTPUTS
+# one bitfield for every output pin; only changed pins get written
+SEQ_METRICS = LoopMetrics("lab1_sequencer", tolerance=0.005)
+outputs, L1, L2, SEVEN_SEG = config_outputs(GPIO, CONFIG, metrics=SEQ_METRICS)
+
+
 # GPIO SETUP 
 def setup_gpio():
     GPIO.setmode(GPIO.BCM)
     GPIO.setwarnings(False)
 
-    # RGB outputs
-    for pin in (L1_R, L1_G, L1_B, L2_R, L2_G, L2_B):
-        GPIO.setup(pin, GPIO.OUT)
-        GPIO.output(pin, GPIO.LOW)
-
-    # 7-seg outputs
-    for pin in SEG_PINS.values():
-        GPIO.setup(pin, GPIO.OUT)
-        GPIO.output(pin, GPIO.LOW)
+    # RGB + 7-seg outputs
+    for pin in outputs.pins:
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+    outputs.reset()
 
     # Button input with pulldown 
     GPIO.setup(BUTTON, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
 
 
 # HELPERS
-def set_rgb(r_pin, g_pin, b_pin, color: str):
+def set_rgb(light, color: str):
     """Common cathode RGB: HIGH turns the selected color on."""
-    GPIO.output(r_pin, GPIO.LOW)
-    GPIO.output(g_pin, GPIO.LOW)
-    GPIO.output(b_pin, GPIO.LOW)
-
-    if color == "red":
-        GPIO.output(r_pin, GPIO.HIGH)
-    elif color == "green":
-        GPIO.output(g_pin, GPIO.HIGH)
-    elif color == "blue":
-        GPIO.output(b_pin, GPIO.HIGH)
-    elif color == "off":
-        pass 
-    else:
-        pass
+    light.set(color)
 
 
 def clear_7seg():
-    for pin in SEG_PINS.values():
-        GPIO.output(pin, GPIO.LOW)
+    SEVEN_SEG.set(None)
 
 
 def show_digit(d: int):
-    clear_7seg()
-    for seg in DIGITS.get(d, []):
-        GPIO.output(SEG_PINS[seg], GPIO.HIGH)
-
-
-def blink_light2_blue(times: int = 3, on_time: float = 0.25, off_time: float = 0.25):
-    for _ in range(times):
-        set_rgb(L2_R, L2_G, L2_B, "blue")
-        time.sleep(on_time)
-        set_rgb(L2_R, L2_G, L2_B, "off")
-        time.sleep(off_time)
-    set_rgb(L2_R, L2_G, L2_B, "red")
+    SEVEN_SEG.set(d)
 
 
-def run_countdown_l1():
+# SEQUENCE
+# (b)-(e) run as timed steps on the scheduler thread, nothing here blocks
+scheduler = Scheduler(metrics=SEQ_METRICS)
 
-    set_rgb(L1_R, L1_G, L1_B, "green")
 
-    for n in range(9, -1, -1):
-        show_digit(n)
-
-        if n > 4:
-            set_rgb(L1_R, L1_G, L1_B, "green")
-            time.sleep(1.0)
-        else:
-            start = time.monotonic()
-            duration = 1.0
-            flash = 0.2
-            while time.monotonic() - start < duration:
-                set_rgb(L1_R, L1_G, L1_B, "blue")
-                time.sleep(flash)
-                set_rgb(L1_R, L1_G, L1_B, "off")
-                time.sleep(flash)
-
-    clear_7seg()
-    set_rgb(L1_R, L1_G, L1_B, "red")
-    set_rgb(L2_R, L2_G, L2_B, "green")
+def on_sequence_done():
+    global sequence_running
+    with state_lock:
+        sequence_running = False
 
 
-def run_sequence():
-    blink_light2_blue(times=3, on_time=0.25, off_time=0.25)
-    run_countdown_l1()
+sequencer = TrafficSequencer(
+    scheduler,
+    {
+        "l1": lambda color: set_rgb(L1, color),
+        "l2": lambda color: set_rgb(L2, color),
+        "digit": show_digit,
+        "clear": clear_7seg,
+    },
+    build_steps(blink_times=3, on_time=0.25, off_time=0.25),
+    on_done=on_sequence_done,
+)
 
 
 # INTERRUPT CALLBACK 
@@ -134,11 +84,11 @@ def button_callback(channel):
     Keep it FAST:
       - enforce cooldown
       - avoid re-entrancy
-      - signal main loop to run the sequence
+      - start the sequence (returns immediately)
     """
     global last_valid_press_time, sequence_running
 
-    now = time.time()
+    now = time.monotonic()
     with state_lock:
         if sequence_running:
             return
@@ -147,37 +97,44 @@ def button_callback(channel):
 
         last_valid_press_time = now
         sequence_running = True
-        press_event.set()
+    sequencer.start()
 
 
 
 def main():
-    global sequence_running
-
     setup_gpio()
+    scheduler.start()
+    # profile the scheduler thread: the light/7-seg steps run there
+    instrumentation = setup_from_env(thread_id=scheduler.thread_id)
 
     # default state
-    set_rgb(L1_R, L1_G, L1_B, "red")
-    set_rgb(L2_R, L2_G, L2_B, "green")
+    set_rgb(L1, "red")
+    set_rgb(L2, "green")
     clear_7seg()
 
     # Interrupt on RISING edge because pull-down 
     GPIO.add_event_detect(BUTTON, GPIO.RISING, callback=button_callback, bouncetime=200)
 
     try:
+        # main thread is free: report what the sequencer is doing
+        last = None
         while True:
-            press_event.wait()
-            press_event.clear()
-            
-            run_sequence()
-
-            with state_lock:
-                sequence_running = False
+            time.sleep(STATUS_EVERY)
+            st = sequencer.state()
+            if st["running"] or last:
+                print(f"phase={st['phase']} digit={st['digit']} "
+                      f"elapsed={st['elapsed']:.2f}s remaining={st['remaining']:.2f}s")
+            last = st["running"]
 
     finally:
+        sequencer.cancel(restore=False)
+        scheduler.stop()
+        instrumentation.stop()
+        print("timing:", scheduler.stats.summary())
+        print("outputs:", outputs.stats())
         clear_7seg()
-        set_rgb(L1_R, L1_G, L1_B, "off")
-        set_rgb(L2_R, L2_G, L2_B, "off")
+        set_rgb(L1, "off")
+        set_rgb(L2, "off")
         GPIO.cleanup()
 
 
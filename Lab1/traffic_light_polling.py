@@ -1,40 +1,26 @@
-import time
 import RPi.GPIO as GPIO
 
-#Pin mapping (BCM numbering)
-# Traffic Light RGB
-L1_R , L1_G, L1_B = 17, 27, 22
-L2_R, L2_G, L2_B = 23, 24, 25
-
-# Button with pull-down resistor
-BUTTON = 5
-
-# 7-segment segments a,b,c,d,e,f,g,dp
-SEG_PINS = {
-    "a": 13,
-    "b": 6,
-    "c": 16,
-    "d": 20,
-    "e": 21,
-    "f": 19,
-    "g": 26,
-    "dp": 12, 
-}
-DIGITS = {
-    0: ["a","b","c","d","e","f"],
-    1: ["b","c"],
-    2: ["a","b","d","e","g"],
-    3: ["a","b","c","d","g"],
-    4: ["b","c","f","g"],
-    5: ["a","c","d","f","g"],
-    6: ["a","c","d","e","f","g"],
-    7: ["a","b","c"],
-    8: ["a","b","c","d","e","f","g"],
-    9: ["a","b","c","d","f","g"],
-}
+import labpath  # noqa: F401
+from metrics import LoopMetrics, setup_from_env
+from button_input import make_button
+from outputs import LAB1_CONFIG, config_outputs
+from sequencer import Scheduler, TrafficSequencer, build_steps
+
+# Pin mapping (BCM numbering): see LAB1_CONFIG in outputs.py
+CONFIG = LAB1_CONFIG
+BUTTON = CONFIG.button
 COOLDOWN_SECONDS = 20
 POLL_DELAY = 0.01
 DEBOUNCE_SECONDS = 0.2
+# how the button is read: "fixed" (poll every POLL_DELAY), "adaptive"
+# (poll fast after activity, slow when idle) or "edge" (block on the edge)
+INPUT_MODE = "edge"
+WAIT_SLICE = 0.5   # s, longest we stay blocked before checking back in
+
+# one bitfield for every output pin; only changed pins get written.
+# SEQ_METRICS gets each step's lateness and the GPIO write time
+SEQ_METRICS = LoopMetrics("lab1_sequencer", tolerance=0.005)
+outputs, L1, L2, SEVEN_SEG = config_outputs(GPIO, CONFIG, metrics=SEQ_METRICS)
 
 def setup_gpio():
     # set it as BCM numbering
@@ -42,130 +28,77 @@ def setup_gpio():
 
     GPIO.setwarnings(False)
 
-    # Light outputs setup 
-    for pin in (L1_R, L1_G, L1_B, L2_R, L2_G, L2_B):
-        GPIO.setup(pin,GPIO.OUT)
-        GPIO.output(pin,GPIO.LOW)
-
-    # 7 segments outputs setup
-    for pin in SEG_PINS.values():
-        GPIO.setup(pin, GPIO.OUT)
-        GPIO.output(pin, GPIO.LOW)
+    # Light + 7 segments outputs setup
+    for pin in outputs.pins:
+        GPIO.setup(pin, GPIO.OUT, initial=GPIO.LOW)
+    outputs.reset()
     GPIO.setup(BUTTON, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
 
-# sets color for light
-def set_rgb(r_pin, g_pin, b_pin, color:str):
-    GPIO.output(r_pin,GPIO.LOW)
-    GPIO.output(g_pin,GPIO.LOW)
-    GPIO.output(b_pin,GPIO.LOW)
-    if color == "red":
-        GPIO.output(r_pin,GPIO.HIGH)
-    elif color == "green":
-        GPIO.output(g_pin,GPIO.HIGH)
-    elif color == "blue":
-        GPIO.output(b_pin,GPIO.HIGH)
-    elif color == "off":
-        GPIO.output(r_pin,GPIO.LOW)
-        GPIO.output(g_pin,GPIO.LOW)
-        GPIO.output(b_pin,GPIO.LOW)
-    else:
-        pass
+# sets color for light (L1 or L2)
+def set_rgb(light, color:str):
+    light.set(color)
 
 # turn off 7 seg
 def clear_7seg():
-    for pin in SEG_PINS.values():
-        GPIO.output(pin,GPIO.LOW)
+    SEVEN_SEG.set(None)
 
 # show digit as int on 7 seg
 def show_digit(d:int):
-    clear_7seg()
-    for num in DIGITS.get(d,[]):
-        GPIO.output(SEG_PINS[num],GPIO.HIGH)
-
-# 4b when the button is pressed, traffic light 2 turns 
-# to blue, blinks 3 times, turns red
-def blink_light2_blue(times: int = 3, on_time: float = 0.5, off_time: float = 0.5):
-    for i in range(times):
-        set_rgb(L2_R,L2_G,L2_B, "blue")
-        time.sleep(on_time)
-        set_rgb(L2_R,L2_G,L2_B, "off")
-        time.sleep(off_time)
-    set_rgb(L2_R,L2_G,L2_B, "red")
-
-#4 c,d,e
-def run_countdown_l1():
-    
-    set_rgb(L1_R,L1_G,L1_B, "green")
-
-    for n in range (9, -1 ,-1):
-        show_digit(n)
-        start = time.monotonic()
-        duration = 1.0
-        off_time = 0.2
-        if n <= 4:
-            while time.monotonic() - start < duration:       
-                set_rgb(L1_R,L1_G,L1_B, "blue")
-                time.sleep(off_time)
-                if time.monotonic() - start > duration:
-                    break
-                set_rgb(L1_R,L1_G,L1_B, "off")
-                time.sleep(off_time)
-    clear_7seg()
-    set_rgb(L1_R,L1_G,L1_B, "red")
-    set_rgb(L2_R,L2_G,L2_B, "green")
-
+    SEVEN_SEG.set(d)
+
+# 4b,c,d,e when the button is pressed: traffic light 2 blinks blue 3 times
+# then turns red, TL1 counts down (flashing blue at 4..0), then TL1 red/TL2
+# green. Runs as timed steps on the scheduler thread so polling never stops.
+scheduler = Scheduler(metrics=SEQ_METRICS)
+sequencer = TrafficSequencer(
+    scheduler,
+    {
+        "l1": lambda color: set_rgb(L1, color),
+        "l2": lambda color: set_rgb(L2, color),
+        "digit": show_digit,
+        "clear": clear_7seg,
+    },
+    build_steps(blink_times=3, on_time=0.25, off_time=0.25),
+)
 
-# make read_button_debounced
-def read_button_pressed_debounce(last_press_time: float) -> bool:
-    pressed = (GPIO.input(BUTTON) == GPIO.HIGH)
-    if not pressed:
-        return False
 
-    now = time.time()
-    if now - last_press_time < DEBOUNCE_SECONDS:
-        return False
-
-    return True
 def main():
     setup_gpio()
+    scheduler.start()
+    # profile the scheduler thread: the light/7-seg steps run there
+    instrumentation = setup_from_env(thread_id=scheduler.thread_id)
 
     # (a) initial: TL2 green, TL1 red
-    set_rgb(L1_R, L1_G, L1_B, "red")
-    set_rgb(L2_R, L2_G, L2_B, "green")
+    set_rgb(L1, "red")
+    set_rgb(L2, "green")
     clear_7seg()
 
-    last_debounce_time = 0.0
-    last_valid_press_time = -1e9  # so first press is always allowed
+    # debounced presses; (f) cooldown: only accept if 20 seconds passed
+    extra = {"interval": POLL_DELAY} if INPUT_MODE == "fixed" else {}
+    button = make_button(INPUT_MODE, GPIO, BUTTON, debounce=DEBOUNCE_SECONDS,
+                         cooldown=COOLDOWN_SECONDS, **extra)
 
     try:
         while True:
             # Keep TL2 green when idle (safe re-assert)
             # (doesn't hurt even if already green)
-            # set_rgb(L2_R, L2_G, L2_B, "green")  # optional
-
-            # detect press (debounced)
-            if read_button_pressed_debounce(last_debounce_time):
-                last_debounce_time = time.time()
-
-                now = time.time()
-                # (f) cooldown: only accept if 20 seconds passed
-                if now - last_valid_press_time >= COOLDOWN_SECONDS:
-                    last_valid_press_time = now
-
-                    # (b) TL2 blue blink then red
-                    blink_light2_blue(times=3, on_time=0.25, off_time=0.25)
-
-                    # (c)(d)(e) TL1 countdown + flashing + restore
-                    run_countdown_l1()
-
-                # else: ignore press during cooldown
+            # set_rgb(L2, "green")  # optional
 
-            time.sleep(POLL_DELAY)
+            # detect press (debounced, outside cooldown)
+            if button.wait(WAIT_SLICE) is not None:
+                # (b)-(e) returns at once, the scheduler runs the steps
+                sequencer.start()
 
     finally:
+        sequencer.cancel(restore=False)
+        scheduler.stop()
+        instrumentation.stop()
+        print("timing:", scheduler.stats.summary())
+        print("outputs:", outputs.stats())
+        print("input:", button.stats())
         clear_7seg()
-        set_rgb(L1_R, L1_G, L1_B, "off")
-        set_rgb(L2_R, L2_G, L2_B, "off")
+        set_rgb(L1, "off")
+        set_rgb(L2, "off")
         GPIO.cleanup()
 
 
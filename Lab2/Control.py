@@ -1,9 +1,21 @@
 import RPi.GPIO as GPIO
 import time
 
-from sin_wave import sin_wave
-from triangle import triangle_wave
-from square import square_wave
+import labpath  # noqa: F401
+from sin_wave import sin_wave, WRITE_TIME as SIN_WRITE_TIME
+from triangle import triangle_wave, WRITE_TIME as TRIANGLE_WRITE_TIME
+from square import square_wave, WRITE_TIME as SQUARE_WRITE_TIME
+from metrics import REGISTRY, setup_from_env
+from realtime import from_env as realtime_from_env
+
+# each generator times one DAC write when it is imported
+for wave, write_time in (("sin", SIN_WRITE_TIME), ("triangle", TRIANGLE_WRITE_TIME),
+                         ("square", SQUARE_WRITE_TIME)):
+    REGISTRY.gauge("dac_first_write_seconds", "DAC write time measured at import",
+                   wave=wave).set(write_time)
+
+# Real-time mode while a waveform runs (off unless LAB_RT=1, see realtime/)
+RT = realtime_from_env()
 
 BUTTON_PIN = 17  # BCM GPIO17 (physical pin 11)
 
@@ -51,6 +63,7 @@ def get_user_inputs():
 # ----------------------------
 # Main loop
 # ----------------------------
+instrumentation = setup_from_env()
 try:
     while True:
         # Requirement: display nothing until button is pressed
@@ -59,12 +72,16 @@ try:
         shape, freq, vmax = get_user_inputs()
 
         # Run waveform until button is pressed again
-        if shape == "sin":
-            sin_wave(freq, vmax, button_pressed)
-        elif shape == "triangle":
-            triangle_wave(freq, vmax, button_pressed)
-        else:
-            square_wave(freq, vmax, button_pressed)
+        with RT:
+            if RT.enabled:
+                print(RT.describe())
+            if shape == "sin":
+                sin_wave(freq, vmax, button_pressed)
+            elif shape == "triangle":
+                triangle_wave(freq, vmax, button_pressed)
+            else:
+                square_wave(freq, vmax, button_pressed)
 
 finally:
+    instrumentation.stop()
     GPIO.cleanup()
\ No newline at end of file
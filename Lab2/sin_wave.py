@@ -4,6 +4,9 @@ import board
 import busio
 import adafruit_mcp4725
 
+import labpath  # noqa: F401
+from metrics import LoopMetrics
+
 VCC = 3.3
 I2C_ADDR = 0x62
 SAMPLE_RATE = 2000  # Hz
@@ -22,6 +25,11 @@ def measure_write_time():
 
 WRITE_TIME = measure_write_time()
 
+# lateness = how far past its absolute 1/SAMPLE_RATE deadline each write
+# starts (write time, sleep overshoot and loop overhead all count); a whole
+# slot late is a missed sample
+LOOP = LoopMetrics("lab2_sin", tolerance=1.0 / SAMPLE_RATE)
+
 def sin_wave(freq, vmax, stop_check):
     dt = 1.0 / SAMPLE_RATE
     phase = 0.0
@@ -30,6 +38,8 @@ def sin_wave(freq, vmax, stop_check):
     amplitude = vmax / 2.0
     offset = vmax / 2.0
 
+    LOOP.restart()
+    next_t = time.perf_counter()
     while True:
         if stop_check():
             return
@@ -39,13 +49,17 @@ def sin_wave(freq, vmax, stop_check):
 
         # Measure write time
         t0 = time.perf_counter()
+        LOOP.tick(t0)
         dac.value = volts_to_dac(voltage)
         elapsed = time.perf_counter() - t0
+        LOOP.io(elapsed)
 
-        # Sleep for the remaining time
-        remaining = dt - elapsed
+        # Sleep until the next slot (absolute, so overhead doesn't add up)
+        next_t += dt
+        remaining = next_t - time.perf_counter()
         if remaining > 0:
             time.sleep(remaining)
+        LOOP.late(time.perf_counter() - next_t)
 
         # Advance phase
         phase += omega * dt
@@ -3,6 +3,9 @@ import board
 import busio
 import adafruit_mcp4725
 
+import labpath  # noqa: F401
+from metrics import LoopMetrics
+
 VCC = 3.3
 I2C_ADDR = 0x62
 
@@ -20,6 +23,12 @@ def measure_write_time():
 
 WRITE_TIME = measure_write_time()
 
+# one iteration = one half period; lateness = how far past its absolute
+# deadline each edge starts. An edge may be EDGE_TOLERANCE late, not half a
+# period, so it is held to about one sin/triangle sample slot
+EDGE_TOLERANCE = 0.0005  # s
+LOOP = LoopMetrics("lab2_square", tolerance=EDGE_TOLERANCE)
+
 def square_wave(freq, vmax, stop_check):
     period = 1.0 / freq
     half = period / 2.0
@@ -27,20 +36,22 @@ def square_wave(freq, vmax, stop_check):
     high = volts_to_dac(vmax)
     low = volts_to_dac(0.0)
 
+    LOOP.restart()
+    next_t = time.perf_counter()
     while True:
-        if stop_check():
-            return
-
-        t0 = time.perf_counter()
-        dac.value = high
-        elapsed = time.perf_counter() - t0
-        time.sleep(max(0, half - elapsed))
-
-        if stop_check():
-            return
-
-        t0 = time.perf_counter()
-        dac.value = low
-        elapsed = time.perf_counter() - t0
-        time.sleep(max(0, half - elapsed))
+        for level in (high, low):
+            if stop_check():
+                return
+
+            t0 = time.perf_counter()
+            LOOP.tick(t0)
+            dac.value = level
+            elapsed = time.perf_counter() - t0
+            LOOP.io(elapsed)
+
+            next_t += half
+            remaining = next_t - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            LOOP.late(time.perf_counter() - next_t)
 
@@ -3,6 +3,9 @@ import board
 import busio
 import adafruit_mcp4725
 
+import labpath  # noqa: F401
+from metrics import LoopMetrics
+
 VCC = 3.3
 I2C_ADDR = 0x62
 SAMPLE_RATE = 2000  # Hz
@@ -21,11 +24,16 @@ def measure_write_time():
 
 WRITE_TIME = measure_write_time()
 
+# same lateness and miss rule as sin_wave.py
+LOOP = LoopMetrics("lab2_triangle", tolerance=1.0 / SAMPLE_RATE)
+
 def triangle_wave(freq, vmax, stop_check):
     samples_per_cycle = int(SAMPLE_RATE / freq)
     half = samples_per_cycle // 2
     dt = 1.0 / SAMPLE_RATE
 
+    LOOP.restart()
+    next_t = time.perf_counter()
     while True:
         # ramp up
         for i in range(half):
@@ -36,13 +44,17 @@ def triangle_wave(freq, vmax, stop_check):
 
             # measure write time
             t0 = time.perf_counter()
+            LOOP.tick(t0)
             dac.value = volts_to_dac(voltage)
             elapsed = time.perf_counter() - t0
+            LOOP.io(elapsed)
 
-            # sleep for remaining time
-            remaining = dt - elapsed
+            # sleep until the next absolute slot
+            next_t += dt
+            remaining = next_t - time.perf_counter()
             if remaining > 0:
                 time.sleep(remaining)
+            LOOP.late(time.perf_counter() - next_t)
 
         # ramp down
         for i in range(half):
@@ -52,9 +64,13 @@ def triangle_wave(freq, vmax, stop_check):
             voltage = vmax * (1.0 - i / (half - 1))
 
             t0 = time.perf_counter()
+            LOOP.tick(t0)
             dac.value = volts_to_dac(voltage)
             elapsed = time.perf_counter() - t0
+            LOOP.io(elapsed)
 
-            remaining = dt - elapsed
+            next_t += dt
+            remaining = next_t - time.perf_counter()
             if remaining > 0:
                 time.sleep(remaining)
+            LOOP.late(time.perf_counter() - next_t)
@@ -33,6 +33,11 @@ import numpy as np
 import spidev
 import RPi.GPIO as GPIO
 
+import labpath  # noqa: F401
+from metrics import LoopMetrics, REGISTRY, setup_from_env
+from realtime import from_env as realtime_from_env
+from sample_bus import BusWriter
+
 
 # USER SETTINGS 
 SPI_BUS = 0
@@ -45,6 +50,21 @@ SAMPLE_RATE = 5000
 CAPTURE_SECONDS = 2.0     
 SPI_HZ = 1_000_000        
 
+# Capture timing and analysis results (metrics/: LAB_METRICS_FILE to export)
+CAPTURE = LoopMetrics("lab3_capture", tolerance=1.0 / SAMPLE_RATE)
+ACTUAL_FS = REGISTRY.gauge("lab3_actual_fs_hz", "measured sampling rate of the last capture")
+ANALYSIS_TIME = REGISTRY.histogram("lab3_analysis_seconds", "FFT + ZC + classify time per window")
+FREQ_FFT = REGISTRY.gauge("lab3_frequency_hz", "last frequency estimate", method="fft")
+FREQ_ZC = REGISTRY.gauge("lab3_frequency_hz", "last frequency estimate", method="zc")
+
+# Publish every window + result to shared memory for other processes
+# (dashboard, logger, ...: see sample_bus.py)
+PUBLISH = True
+PUBLISH_TIME = REGISTRY.histogram("lab3_publish_seconds", "sample bus write time per window")
+
+# RealtimeMode held around each capture (LAB_RT=1 to enable, see realtime/)
+RT = realtime_from_env()
+
 
 
 def setup_spi_and_gpio():
@@ -78,25 +98,33 @@ def capture_samples(spi, fs: int, seconds: float):
     n = int(fs * seconds)
     x = np.empty(n, dtype=np.float64)
 
-    dt = 1.0 / fs
-    t0 = time.perf_counter()
-    next_t = t0
-
-    for i in range(n):
-        # Read ADC
-        raw = mcp3008_read(spi, ADC_CH)
-        x[i] = (raw / 1023.0) * VREF
-
-        # crude timing control
-        next_t += dt
-        while True:
-            now = time.perf_counter()
-            if now >= next_t:
-                break
+    with RT:
+        RT.prefault(x)
+        dt = 1.0 / fs
+        t0 = time.perf_counter()
+        next_t = t0
+
+        CAPTURE.restart()
+        for i in range(n):
+            # Read ADC (lateness = how far past this sample's slot we got here)
+            r0 = time.perf_counter()
+            CAPTURE.tick(r0)
+            CAPTURE.late(r0 - next_t)
+            raw = mcp3008_read(spi, ADC_CH)
+            CAPTURE.io(time.perf_counter() - r0)
+            x[i] = (raw / 1023.0) * VREF
+
+            # crude timing control
+            next_t += dt
+            while True:
+                now = time.perf_counter()
+                if now >= next_t:
+                    break
+        t1 = time.perf_counter()
 
     # Actual measured sampling rate
-    t1 = time.perf_counter()
     actual_fs = (n - 1) / (t1 - t0) if (t1 - t0) > 0 else fs
+    ACTUAL_FS.set(actual_fs)
     return x, actual_fs
 
 
@@ -227,13 +255,32 @@ def classify_waveform(x, fs):
 
 def main():
     spi = setup_spi_and_gpio()
+    instrumentation = setup_from_env()
+    bus = BusWriter() if PUBLISH else None
+    rt_shown = False
     try:
         while True:
             x, actual_fs = capture_samples(spi, SAMPLE_RATE, CAPTURE_SECONDS)
+            if RT.enabled and not rt_shown:
+                print(RT.describe())
+                rt_shown = True
 
+            a0 = time.perf_counter()
             f_fft, _, _ = estimate_frequency_fft(x, actual_fs)
             f_zc = estimate_frequency_zero_cross(x, actual_fs)
             shape, feats = classify_waveform(x, actual_fs)
+            ANALYSIS_TIME.record(time.perf_counter() - a0)
+            FREQ_FFT.set(f_fft)
+            FREQ_ZC.set(f_zc)
+
+            if bus is not None:
+                p0 = time.perf_counter()
+                bus.publish(x, actual_fs, f_fft, f_zc, shape, feats)
+                PUBLISH_TIME.record(time.perf_counter() - p0)
+                for r in bus.readers():
+                    if r["behind"]:
+                        print(f"bus reader pid {r['pid']} is falling behind "
+                              f"({r['sample_lag']} samples, {r['overruns']} overruns)")
 
             # pick a frequency to print (FFT usually better; use ZC as sanity check)
             f_out = f_fft if f_fft > 0 else f_zc
@@ -251,6 +298,9 @@ def main():
             time.sleep(0.2)
 
     finally:
+        if bus is not None:
+            bus.close()
+        instrumentation.stop()
         spi.close()
         GPIO.cleanup()
 
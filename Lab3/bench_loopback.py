@@ -0,0 +1,251 @@
+# bench_loopback.py
+# CSCE 462 - Lab 3: closed-loop generator -> analyzer benchmark
+#
+# Drives the Lab2 waveform generators into this lab's capture_samples() /
+# classify_waveform() on the simulated hardware (../hwsim): the generator
+# writes the MCP4725, an AnalogChannel adds noise, coarser quantisation and
+# sample-clock jitter, and the MCP3008 reads the result back. Sweeps
+# shape x frequency x amplitude and reports per configuration:
+#   acc       classification accuracy over the trials
+#   fft/zc    mean |frequency error| of both estimators, % of the true f
+#   ttr       time-to-result: capture (virtual s) + analysis (wall s)
+#   cpu       CPU ms for one FFT + ZC + classify pass
+#
+# Both labs' loops block, so they can't run side by side on one virtual
+# clock. Each generator runs first with its DAC writes logged, then every
+# capture plays that log back, time-shifted (random phase per trial), as the
+# ADC input -- the same as sampling the generator while it runs.
+#
+# Lab2 can't generate 0 Hz (triangle divides by it), so the sweep covers
+# 1-50 Hz. Lab2 calls the triangle "triangle", this lab says "tri".
+#
+# Run (no hardware needed):
+#   python3 bench_loopback.py
+#   python3 bench_loopback.py --quick
+#   python3 bench_loopback.py --noise 0.05 --bits 8 --jitter 20e-6
+#   python3 bench_loopback.py --save baseline.json       # record a baseline
+#   python3 bench_loopback.py --compare baseline.json    # flag regressions
+
+import argparse
+import json
+import random
+import time
+
+import labpath  # noqa: F401
+from hwsim import Backend, VirtualClock
+
+
+# captured before the backend patches the time module
+wall_clock = time.perf_counter
+cpu_clock = time.process_time
+
+# shape -> (Lab2 script, generator function, label Lab3 should report)
+SHAPES = {
+    "sin":      ("Lab2/sin_wave.py", "sin_wave", "sin"),
+    "triangle": ("Lab2/triangle.py", "triangle_wave", "tri"),
+    "square":   ("Lab2/square.py", "square_wave", "square"),
+}
+FREQS = [1.0, 2.0, 5.0, 10.0, 20.0, 35.0, 50.0]
+AMPS = [0.5, 1.5, 3.3]
+TRIALS = 3
+SEED = 462
+
+SETTLE_SEC = 0.25        # skip the generator's first writes
+# virtual s per clock read: about a Pi's for the generator, coarser for the
+# capture, which busy-waits on the clock (both keep absolute deadlines)
+GEN_READ_COST = 1e-6
+CAPTURE_READ_COST = 1e-5
+
+# Regression limits for --compare
+MAX_EXTRA_FREQ_ERR = 0.5     # percentage points
+MAX_SLOWDOWN = 1.5           # x baseline analysis CPU time
+
+
+class AnalogChannel:
+    """
+    The wire from the DAC pin to the ADC pin.
+      noise    gaussian noise, V rms
+      bits     quantise to this many bits over vref before the ADC
+               (None: only the MCP3008's own 10 bits)
+      jitter   rms error of the sampling instant, s
+    """
+
+    def __init__(self, noise=0.0, bits=None, jitter=0.0, vref=3.3, seed=SEED):
+        self.noise = noise
+        self.step = vref / ((1 << bits) - 1) if bits else None
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+
+    def source(self, dac, shift):
+        """adc_source(ch, t) seeing dac's output from time t - shift."""
+        gauss = self.rng.gauss
+        noise, step, jitter = self.noise, self.step, self.jitter
+        output_at = dac.output_at
+
+        def adc_source(channel, t):
+            ts = t - shift
+            if jitter:
+                ts += gauss(0.0, jitter)
+            v = output_at(ts)
+            if noise:
+                v += gauss(0.0, noise)
+            if step:
+                v = round(v / step) * step
+            return v
+        return adc_source
+
+
+def run_config(hw, lab3, spi, gen, expected, freq, vmax, channel, seconds, trials, rng):
+    clock = hw.clock
+    gen_fn, dac = gen
+    period = 1.0 / freq
+
+    # generate enough signal for the latest-starting trial
+    t_gen = clock.now()
+    t_end = t_gen + SETTLE_SEC + period + seconds + 0.1
+    clock.read_cost = GEN_READ_COST
+    gen_fn(freq, vmax, lambda: clock.now() >= t_end)
+    clock.read_cost = CAPTURE_READ_COST
+
+    correct = 0
+    fft_err = zc_err = ttr = cpu = 0.0
+    labels = {}
+    for _ in range(trials):
+        start = t_gen + SETTLE_SEC + rng.uniform(0.0, period)
+        hw.adc_source = channel.source(dac, clock.now() - start)
+
+        c0 = clock.now()
+        x, fs = lab3.capture_samples(spi, lab3.SAMPLE_RATE, seconds)
+        capture_s = clock.now() - c0
+
+        w0, p0 = wall_clock(), cpu_clock()
+        f_fft, _, _ = lab3.estimate_frequency_fft(x, fs)
+        f_zc = lab3.estimate_frequency_zero_cross(x, fs)
+        shape, _ = lab3.classify_waveform(x, fs)
+        w1, p1 = wall_clock(), cpu_clock()
+
+        correct += shape == expected
+        labels[shape] = labels.get(shape, 0) + 1
+        fft_err += abs(f_fft - freq) / freq
+        zc_err += abs(f_zc - freq) / freq
+        ttr += capture_s + (w1 - w0)
+        cpu += p1 - p0
+
+    return {
+        "correct": correct,
+        "accuracy": correct / trials,
+        "labels": labels,
+        "fft_err_pct": 100.0 * fft_err / trials,
+        "zc_err_pct": 100.0 * zc_err / trials,
+        "ttr_s": ttr / trials,
+        "cpu_ms": 1e3 * cpu / trials,
+    }
+
+
+def run_all(shapes=SHAPES, freqs=FREQS, amps=AMPS, trials=TRIALS, seconds=None,
+            noise=0.0, bits=None, jitter=0.0, seed=SEED):
+    results = []
+    channel = AnalogChannel(noise, bits, jitter, seed=seed)
+    rng = random.Random(seed)
+    with Backend(VirtualClock(read_cost=CAPTURE_READ_COST)) as hw:
+        lab3 = hw.load("Lab3/Control.py")
+        spi = lab3.setup_spi_and_gpio()
+        if seconds is None:
+            seconds = lab3.CAPTURE_SECONDS
+        for shape in shapes:
+            path, fn_name, expected = SHAPES[shape]
+            lab2 = hw.load(path)
+            gen = (getattr(lab2, fn_name), lab2.dac)
+            for freq in freqs:
+                for vmax in amps:
+                    r = run_config(hw, lab3, spi, gen, expected, freq, vmax,
+                                   channel, seconds, trials, rng)
+                    results.append({"shape": shape, "freq": freq, "vmax": vmax,
+                                    "trials": trials, **r})
+    return results
+
+
+def print_table(results):
+    print(f"{'shape':8s} {'f Hz':>5s} {'Vmax':>4s} {'acc':>4s} {'got':14s} "
+          f"{'fft%':>6s} {'zc%':>6s} {'ttr s':>6s} {'cpu ms':>6s}")
+    for r in results:
+        got = ",".join(f"{k}:{v}" for k, v in sorted(r["labels"].items()))
+        print(f"{r['shape']:8s} {r['freq']:5.1f} {r['vmax']:4.1f} {r['accuracy']:4.0%} {got:14s} "
+              f"{r['fft_err_pct']:6.2f} {r['zc_err_pct']:6.2f} {r['ttr_s']:6.3f} {r['cpu_ms']:6.2f}")
+
+    for shape in SHAPES:
+        rows = [r for r in results if r["shape"] == shape]
+        if not rows:
+            continue
+        correct = sum(r["correct"] for r in rows)
+        total = sum(r["trials"] for r in rows)
+        # median: a failed estimate is off by orders of magnitude
+        fft = sorted(r["fft_err_pct"] for r in rows)[len(rows) // 2]
+        cpu = sum(r["cpu_ms"] for r in rows) / len(rows)
+        print(f"{shape:8s} accuracy {correct}/{total} ({100.0 * correct / total:.0f}%), "
+              f"median fft error {fft:.2f}%, mean {cpu:.2f} CPU ms/window")
+
+
+def compare(results, baseline):
+    """Returns a list of regression messages (empty = ok)."""
+    base = {(b["shape"], b["freq"], b["vmax"]): b for b in baseline}
+    problems = []
+    for r in results:
+        b = base.get((r["shape"], r["freq"], r["vmax"]))
+        if b is None:
+            continue
+        key = f"{r['shape']}@{r['freq']:g}Hz/{r['vmax']:g}V"
+        if r["accuracy"] < b["accuracy"]:
+            problems.append(f"{key}: accuracy {r['accuracy']:.0%} (baseline {b['accuracy']:.0%})")
+        for k in ("fft_err_pct", "zc_err_pct"):
+            if r[k] > b[k] + MAX_EXTRA_FREQ_ERR:
+                problems.append(f"{key}: {k} {r[k]:.2f} (baseline {b[k]:.2f})")
+        if r["cpu_ms"] > MAX_SLOWDOWN * b["cpu_ms"]:
+            problems.append(f"{key}: {r['cpu_ms']:.2f} CPU ms (baseline {b['cpu_ms']:.2f})")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lab2 generator -> Lab3 analyzer loopback benchmark")
+    ap.add_argument("--shape", choices=list(SHAPES), action="append")
+    ap.add_argument("--freqs", type=float, nargs="+", default=FREQS)
+    ap.add_argument("--amps", type=float, nargs="+", default=AMPS)
+    ap.add_argument("--trials", type=int, default=TRIALS)
+    ap.add_argument("--seconds", type=float, default=None, help="capture length (default: Lab3's)")
+    ap.add_argument("--noise", type=float, default=0.0, help="channel noise, V rms")
+    ap.add_argument("--bits", type=int, default=None, help="channel quantisation, bits over vref")
+    ap.add_argument("--jitter", type=float, default=0.0, help="sample-clock jitter, s rms")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--quick", action="store_true", help="3 frequencies, full-scale only, 1 trial")
+    ap.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    ap.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    args = ap.parse_args()
+
+    if args.quick:
+        args.freqs, args.amps, args.trials = [2.0, 10.0, 50.0], [3.3], 1
+
+    w0 = wall_clock()
+    results = run_all(args.shape or list(SHAPES), args.freqs, args.amps, args.trials,
+                      args.seconds, args.noise, args.bits, args.jitter, args.seed)
+    print_table(results)
+    print(f"\n{len(results)} configurations in {wall_clock() - w0:.1f} s wall "
+          f"(noise {args.noise} V, bits {args.bits or 10}, jitter {1e6 * args.jitter:g} us)")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare(results, json.load(f))
+        if problems:
+            print("\nREGRESSIONS:")
+            for p in problems:
+                print("  " + p)
+            raise SystemExit(1)
+        print("\nno regressions vs baseline")
+
+
+if __name__ == "__main__":
+    main()
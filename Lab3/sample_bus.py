@@ -0,0 +1,478 @@
+# sample_bus.py
+# CSCE 462 - Lab 3: raw samples + analysis results in shared memory
+#
+# Control.py is the only process that talks to the MCP3008. It publishes
+# every captured window and its result (f0 FFT/ZC, label, features) here, and
+# any number of local processes (dashboard, logger, alerting) attach and read
+# without touching SPI.
+#
+# One multiprocessing.shared_memory segment:
+#   header    sequence counters, capacities, fs, writer pid
+#   readers   one row per attached reader: pid, its cursors, overrun count
+#   samples   float64 ring; sample number s lives at s % SAMPLE_CAPACITY
+#   results   RESULT_DTYPE ring; result number r lives at r % RESULT_CAPACITY
+#
+# The writer never waits for anyone: it copies the data in, then bumps the
+# counter. Readers get NumPy views of the samples straight into the segment
+# (no copy), so a reader that is slower than the writer can have its data
+# overwritten: reads skip ahead past anything already overwritten (counted
+# as an overrun), and intact(seq) checked *after* using a view tells whether
+# what was read is still good. Results are small, so they are copied out and
+# their seq re-checked after the copy (a seqlock), never handed out as views.
+#
+# Python has no memory barriers, so nothing orders the writer's stores as
+# another core sees them (ARM may reorder them). The checks above catch an
+# overwrite that is visible by the time they run; they are not a proof.
+# BusWriter.readers() shows every reader's lag, so the sampler side can flag
+# the slow ones.
+#
+# Only one writer at a time: a second BusWriter refuses a bus whose writer
+# is still running, and only replaces the segment of one that died. Readers
+# treat a dead writer like a closed bus; the reader below then waits for
+# the next writer's segment and attaches to that.
+#
+# Run a reader (while Control.py is running):
+#   python3 sample_bus.py
+
+import argparse
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+BUS_NAME = "lab3_bus"
+SAMPLE_CAPACITY = 1 << 16      # ~13 s at 5 kHz
+RESULT_CAPACITY = 256
+MAX_READERS = 16
+
+MAGIC = 0x4C414233             # "LAB3"
+VERSION = 1
+
+# header (int64 slots)
+# H_SAMPLE_CLAIM moves ahead *before* samples are copied in, H_SAMPLE_SEQ
+# after, so a reader can tell a slot is being overwritten right now
+H_MAGIC, H_VERSION, H_SAMPLE_CAP, H_RESULT_CAP, H_MAX_READERS, \
+    H_SAMPLE_SEQ, H_SAMPLE_CLAIM, H_RESULT_SEQ, H_WRITER_PID, H_CLOSED = range(10)
+HEADER_SLOTS = 16              # 5 spare; fs is a float64 in slot 15
+H_FS = 15
+
+# reader table columns
+R_PID, R_SAMPLE_SEQ, R_RESULT_SEQ, R_OVERRUNS = range(4)
+READER_COLS = 4
+
+LABEL_LEN = 8
+RESULT_DTYPE = np.dtype([
+    ("seq", "i8"),             # result number; also marks the slot as written
+    ("time", "f8"),            # time.time() when published
+    ("start", "i8"),           # sample number of the window's first sample
+    ("n", "i8"),               # samples in the window
+    ("fs", "f8"),
+    ("f_fft", "f8"),
+    ("f_zc", "f8"),
+    ("label", f"S{LABEL_LEN}"),
+    ("r2", "f8"),
+    ("r3", "f8"),
+    ("r5", "f8"),
+    ("frac_extreme", "f8"),
+    ("slope_cv", "f8"),
+])
+FEATURES = ("r2", "r3", "r5", "frac_extreme", "slope_cv")
+
+
+def _layout(sample_cap, result_cap, max_readers):
+    """Byte offsets of each section (64-byte aligned) and the total size."""
+    def align(n):
+        return (n + 63) & ~63
+    header = 0
+    readers = align(HEADER_SLOTS * 8)
+    samples = align(readers + max_readers * READER_COLS * 8)
+    results = align(samples + sample_cap * 8)
+    size = align(results + result_cap * RESULT_DTYPE.itemsize)
+    return header, readers, samples, results, size
+
+
+class _Segment:
+    """NumPy views of the sections of one attached segment."""
+
+    def __init__(self, shm, sample_cap, result_cap, max_readers):
+        self.shm = shm
+        h, r, s, res, _ = _layout(sample_cap, result_cap, max_readers)
+        buf = shm.buf
+        self.header = np.ndarray(HEADER_SLOTS, np.int64, buf, h)
+        self.fs = np.ndarray(1, np.float64, buf, h + H_FS * 8)
+        self.readers = np.ndarray((max_readers, READER_COLS), np.int64, buf, r)
+        self.samples = np.ndarray(sample_cap, np.float64, buf, s)
+        self.results = np.ndarray(result_cap, RESULT_DTYPE, buf, res)
+
+    def release(self):
+        # views must go before the mmap can close
+        self.header = self.fs = self.readers = self.samples = self.results = None
+        self.shm.close()
+
+
+class BusWriter:
+    """The acquisition side. Creates the segment, or replaces one left
+    behind by a writer that died; RuntimeError if that writer is alive."""
+
+    def __init__(self, name=BUS_NAME, sample_capacity=SAMPLE_CAPACITY,
+                 result_capacity=RESULT_CAPACITY, max_readers=MAX_READERS):
+        size = _layout(sample_capacity, result_capacity, max_readers)[-1]
+        try:
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except FileExistsError:
+            old = shared_memory.SharedMemory(name)
+            pid = _writer_pid(old)
+            if pid and _alive(pid):       # including this process
+                # don't let the resource tracker unlink another process's
+                # live bus (our own writer's registration must stay)
+                if pid != os.getpid():
+                    resource_tracker.unregister(old._name, "shared_memory")
+                old.close()
+                raise RuntimeError(f"sample bus {name!r} is in use by pid {pid}")
+            # left behind by a writer that crashed
+            old.close()
+            old.unlink()
+            shm = shared_memory.SharedMemory(name, create=True, size=size)
+        self.name = name
+        self.seg = _Segment(shm, sample_capacity, result_capacity, max_readers)
+        self.sample_capacity = sample_capacity
+        self.result_capacity = result_capacity
+
+        hdr = self.seg.header
+        hdr[:] = 0
+        self.seg.readers[:] = 0
+        self.seg.results["seq"] = -1
+        hdr[H_SAMPLE_CAP] = sample_capacity
+        hdr[H_RESULT_CAP] = result_capacity
+        hdr[H_MAX_READERS] = max_readers
+        hdr[H_VERSION] = VERSION
+        hdr[H_WRITER_PID] = os.getpid()
+        hdr[H_MAGIC] = MAGIC          # last: readers wait for it
+
+    @property
+    def sample_seq(self):
+        return int(self.seg.header[H_SAMPLE_SEQ])
+
+    @property
+    def result_seq(self):
+        return int(self.seg.header[H_RESULT_SEQ])
+
+    def publish_samples(self, x, fs):
+        """Append a window of samples; returns the sample number of x[0]."""
+        x = np.asarray(x, dtype=np.float64)
+        cap = self.sample_capacity
+        start = self.sample_seq
+        if len(x) > cap:
+            # only the newest cap samples fit; the rest count as published
+            start += len(x) - cap
+            x = x[-cap:]
+        self.seg.header[H_SAMPLE_CLAIM] = start + len(x)
+        i = start % cap
+        k = min(len(x), cap - i)
+        ring = self.seg.samples
+        ring[i:i + k] = x[:k]
+        ring[:len(x) - k] = x[k:]
+        self.seg.fs[0] = fs
+        self.seg.header[H_SAMPLE_SEQ] = start + len(x)
+        return start
+
+    def publish_result(self, start, n, fs, f_fft, f_zc, label, features):
+        """Append one analysis result for samples [start, start + n)."""
+        seq = self.result_seq
+        rec = self.seg.results[seq % self.result_capacity]
+        rec["seq"] = -1               # being rewritten
+        rec["time"] = time.time()
+        rec["start"] = start
+        rec["n"] = n
+        rec["fs"] = fs
+        rec["f_fft"] = f_fft
+        rec["f_zc"] = f_zc
+        rec["label"] = label.encode()[:LABEL_LEN]
+        for k in FEATURES:
+            rec[k] = features.get(k, 0.0)
+        rec["seq"] = seq
+        self.seg.header[H_RESULT_SEQ] = seq + 1
+        return seq
+
+    def publish(self, x, fs, f_fft, f_zc, label, features):
+        start = self.publish_samples(x, fs)
+        n = self.sample_seq - start   # < len(x) if x didn't fit the ring
+        return self.publish_result(start, n, fs, f_fft, f_zc, label, features)
+
+    def readers(self):
+        """[{pid, sample_lag, result_lag, overruns, behind}] for live readers.
+        behind: lagging more than half a ring (about to lose data)."""
+        out = []
+        head_s, head_r = self.sample_seq, self.result_seq
+        for row in self.seg.readers:
+            pid = int(row[R_PID])
+            if pid == 0:
+                continue
+            if not _alive(pid):
+                row[:] = 0            # reader died without detaching
+                continue
+            s_lag = head_s - int(row[R_SAMPLE_SEQ])
+            r_lag = head_r - int(row[R_RESULT_SEQ])
+            out.append({
+                "pid": pid,
+                "sample_lag": s_lag,
+                "result_lag": r_lag,
+                "overruns": int(row[R_OVERRUNS]),
+                "behind": s_lag > self.sample_capacity // 2 or r_lag > self.result_capacity // 2,
+            })
+        return out
+
+    def close(self):
+        self.seg.header[H_CLOSED] = 1
+        shm = self.seg.shm
+        self.seg.release()
+        shm.unlink()
+
+
+def _writer_pid(shm):
+    """Writer pid recorded in a segment's header, 0 if it isn't a bus."""
+    if shm.size < HEADER_SLOTS * 8:
+        return 0
+    hdr = np.ndarray(HEADER_SLOTS, np.int64, shm.buf, 0)
+    pid = int(hdr[H_WRITER_PID]) if hdr[H_MAGIC] == MAGIC else 0
+    del hdr
+    return pid
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class BusReader:
+    """
+    A consumer. Starts at the writer's current position (from_start=True:
+    at the oldest data still in the rings).
+
+      for seq, view in reader.read_samples(): ...   # contiguous chunks
+      for rec in reader.read_results(): ...         # RESULT_DTYPE records
+
+    Sample views point into shared memory: copy them (np.array(view)) to
+    keep them, and check intact(seq) after using one, not before. Result
+    records are copies, checked against a concurrent rewrite.
+    """
+
+    def __init__(self, name=BUS_NAME, from_start=False, timeout=5.0):
+        shm = shared_memory.SharedMemory(name)
+        # Python < 3.13 registers attached segments with the resource
+        # tracker, which would unlink the writer's segment when we exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+        hdr = np.ndarray(HEADER_SLOTS, np.int64, shm.buf, 0)
+        deadline = time.monotonic() + timeout
+        while hdr[H_MAGIC] != MAGIC:
+            if time.monotonic() > deadline:
+                del hdr
+                shm.close()
+                raise RuntimeError(f"shared memory {name!r} is not a Lab3 sample bus")
+            time.sleep(0.01)
+        if hdr[H_VERSION] != VERSION:
+            version = int(hdr[H_VERSION])
+            del hdr
+            shm.close()
+            raise RuntimeError(f"sample bus version {version}, expected {VERSION}")
+        sample_cap, result_cap, max_readers = (int(hdr[H_SAMPLE_CAP]), int(hdr[H_RESULT_CAP]),
+                                               int(hdr[H_MAX_READERS]))
+        del hdr
+
+        self.name = name
+        self.seg = _Segment(shm, sample_cap, result_cap, max_readers)
+        self.sample_capacity = sample_cap
+        self.result_capacity = result_cap
+        self.overruns = 0
+        self.dropped_samples = 0
+        self.dropped_results = 0
+
+        head_s, head_r = self._heads()
+        if from_start:
+            self.sample_seq = max(0, head_s - sample_cap)
+            self.result_seq = max(0, head_r - result_cap)
+        else:
+            self.sample_seq, self.result_seq = head_s, head_r
+        self._row = self._claim_row()
+
+    def _heads(self):
+        hdr = self.seg.header
+        return int(hdr[H_SAMPLE_SEQ]), int(hdr[H_RESULT_SEQ])
+
+    def _claim_row(self):
+        # no lock: two readers attaching in the same instant could pick the
+        # same row; the only cost is one of them showing up in readers()
+        for row in self.seg.readers:
+            if row[R_PID] == 0 or not _alive(int(row[R_PID])):
+                row[R_SAMPLE_SEQ] = self.sample_seq
+                row[R_RESULT_SEQ] = self.result_seq
+                row[R_OVERRUNS] = 0
+                row[R_PID] = os.getpid()
+                return row
+        return None                       # table full: read, but untracked
+
+    def _sync_row(self):
+        if self._row is not None:
+            self._row[R_SAMPLE_SEQ] = self.sample_seq
+            self._row[R_RESULT_SEQ] = self.result_seq
+            self._row[R_OVERRUNS] = self.overruns
+
+    @property
+    def fs(self):
+        return float(self.seg.fs[0])
+
+    @property
+    def writer_pid(self):
+        return int(self.seg.header[H_WRITER_PID])
+
+    @property
+    def writer_closed(self):
+        """True once the writer closed the bus or its process is gone. A
+        writer started after that uses a new segment: attach a new reader."""
+        return bool(self.seg.header[H_CLOSED]) or not _alive(self.writer_pid)
+
+    @property
+    def lag(self):
+        """(samples, results) published but not read yet."""
+        head_s, head_r = self._heads()
+        return head_s - self.sample_seq, head_r - self.result_seq
+
+    def intact(self, seq):
+        """True if sample number seq has not been (and is not being)
+        overwritten yet."""
+        return int(self.seg.header[H_SAMPLE_CLAIM]) - seq <= self.sample_capacity
+
+    def read_samples(self, max_n=None):
+        """New samples as [(sample number of view[0], view)], at most two
+        chunks (the ring wraps once)."""
+        cap = self.sample_capacity
+        head = self._heads()[0]
+        oldest = int(self.seg.header[H_SAMPLE_CLAIM]) - cap
+        seq = self.sample_seq
+        if seq < oldest:
+            self.overruns += 1
+            self.dropped_samples += oldest - seq
+            seq = oldest
+        end = head if max_n is None else min(head, seq + max_n)
+        chunks = self._chunks(seq, end)
+        self.sample_seq = end
+        self._sync_row()
+        return chunks
+
+    def _chunks(self, seq, end):
+        cap = self.sample_capacity
+        chunks = []
+        while seq < end:
+            i = seq % cap
+            k = min(end - seq, cap - i)
+            chunks.append((seq, self.seg.samples[i:i + k]))
+            seq += k
+        return chunks
+
+    def read_results(self):
+        """New results, oldest first, as record copies. A record the writer
+        was rewriting during the copy is skipped (counted in
+        dropped_results)."""
+        cap = self.result_capacity
+        head = self._heads()[1]
+        seq = self.result_seq
+        if head - seq > cap:
+            self.overruns += 1
+            self.dropped_results += head - cap - seq
+            seq = head - cap
+        out = []
+        for r in range(seq, head):
+            slot = self.seg.results[r % cap]
+            if slot["seq"] != r:          # being rewritten right now
+                self.dropped_results += 1
+                continue
+            rec = slot.copy()
+            if slot["seq"] == r and rec["seq"] == r:
+                out.append(rec)
+            else:                         # rewritten while we copied
+                self.dropped_results += 1
+        self.result_seq = head
+        self._sync_row()
+        return out
+
+    def window(self, rec):
+        """The samples a result was computed from, as [(seq, view)] chunks,
+        or [] if they have already been overwritten."""
+        start = int(rec["start"])
+        if not self.intact(start):
+            return []
+        return self._chunks(start, start + int(rec["n"]))
+
+    def close(self):
+        if self._row is not None:
+            self._row[:] = 0
+            self._row = None
+        self.seg.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def wait_for_writer(name, from_start, poll):
+    """A reader on the segment of a live writer, once one has started."""
+    said = False
+    while True:
+        try:
+            reader = BusReader(name, from_start=from_start)
+        except FileNotFoundError:
+            pass
+        else:
+            if not reader.writer_closed:
+                return reader
+            reader.close()                # still the dead writer's segment
+        if not said:
+            print(f"waiting for a writer on {name!r}")
+            said = True
+        time.sleep(poll)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Print Lab3 results from the shared sample bus")
+    ap.add_argument("--name", default=BUS_NAME)
+    ap.add_argument("--from-start", action="store_true", help="start at the oldest data kept")
+    ap.add_argument("--poll", type=float, default=0.1, help="s between checks")
+    args = ap.parse_args()
+
+    reader = wait_for_writer(args.name, args.from_start, args.poll)
+    while True:
+        with reader:
+            print(f"attached to {args.name!r} (writer pid {reader.writer_pid}, "
+                  f"{reader.sample_capacity} samples, {reader.result_capacity} results)")
+            while not reader.writer_closed:
+                for rec in reader.read_results():
+                    chunks = reader.window(rec)
+                    vpp = (max(float(v.max()) for _, v in chunks) -
+                           min(float(v.min()) for _, v in chunks)) if chunks else float("nan")
+                    if not reader.intact(int(rec["start"])):
+                        vpp = float("nan")    # overwritten while we read it
+                    print(f"#{int(rec['seq']):5d} {rec['label'].decode():7s} "
+                          f"f_fft={rec['f_fft']:8.3f} Hz f_zc={rec['f_zc']:8.3f} Hz "
+                          f"Vpp={vpp:5.3f} V fs={rec['fs']:.0f} Hz | lag={reader.lag[0]} "
+                          f"overruns={reader.overruns}")
+                time.sleep(args.poll)
+            if reader.seg.header[H_CLOSED]:
+                print("writer closed the bus")
+                return
+            print(f"writer pid {reader.writer_pid} died")
+        # the new writer starts fresh, so read its rings from the beginning
+        reader = wait_for_writer(args.name, True, args.poll)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+# hwsim - simulated Raspberry Pi hardware on a virtual clock.
+#
+# Fakes for RPi.GPIO, I2C (MCP4725 DAC, MPU6050 IMU) and SPI (MCP3008 ADC)
+# so the timing-critical loops of all four labs run on a normal Linux box,
+# in milliseconds, with configurable bus latency. See backend.py.
+#
+#   python3 -m hwsim.demo      # run one scenario from every lab
+
+from .backend import Backend
+from .clock import VirtualClock, SimulationTimeout, run_scheduler
+from .gpio import SimGPIO
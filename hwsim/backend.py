@@ -0,0 +1,185 @@
+# backend.py
+# Installs the simulated hardware in place of the real libraries.
+#
+#   from hwsim import Backend
+#   with Backend() as hw:                       # patches sys.modules + time
+#       lab = hw.load("Lab3/Control.py")        # import a lab script fresh
+#       spi = lab.setup_spi_and_gpio()
+#       x, fs = lab.capture_samples(spi, 5000, 2.0)   # 2 virtual s, ms of CPU
+#
+# While installed:
+#   RPi.GPIO, board, busio, spidev, adafruit_mcp4725, adafruit_mpu6050,
+#   adafruit_extended_bus  -> the fakes in this package
+#   time.time/monotonic/perf_counter/sleep (+ _ns)  -> hw.clock
+#
+# Lab scripts bind things at import (Lab4 does `from time import sleep`,
+# Scheduler defaults to time.monotonic), so always load() them after the
+# backend is installed; load() drops any cached copy of the lab's modules.
+
+import importlib.util
+import os
+import sys
+import time
+import types
+
+from .clock import VirtualClock
+from .gpio import SimGPIO
+from .i2c import SimI2C, SimMCP4725, SimMPU6050, I2C_OVERHEAD, at_rest, no_rotation
+from .spi import SimSpiDev, SPI_OVERHEAD
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_TIME_FUNCS = ("time", "monotonic", "perf_counter", "sleep",
+               "time_ns", "monotonic_ns", "perf_counter_ns")
+_MODULES = ("RPi", "RPi.GPIO", "board", "busio", "spidev",
+            "adafruit_mcp4725", "adafruit_mpu6050", "adafruit_extended_bus")
+
+
+class Backend:
+    """
+    clock            VirtualClock (default: t=0, 1 us per clock read)
+    i2c_overhead     s per I2C transfer on top of the bit time
+    spi_overhead     s per SPI transfer on top of the bit time
+    gpio_latency     s per GPIO.output/input call
+    adc_source       f(channel, t) -> volts seen by the MCP3008
+    accel_sources    {(bus, address): f(t) -> (ax, ay, az)} for MPU6050s
+    """
+
+    def __init__(self, clock=None, i2c_overhead=I2C_OVERHEAD, spi_overhead=SPI_OVERHEAD,
+                 gpio_latency=0.0, adc_source=None, vdd=3.3, vref=3.3):
+        self.clock = clock if clock is not None else VirtualClock(read_cost=1e-6)
+        self.i2c_overhead = i2c_overhead
+        self.spi_overhead = spi_overhead
+        self.vdd = vdd
+        self.vref = vref
+        self.gpio = SimGPIO(self.clock, latency=gpio_latency)
+        self.adc_source = adc_source if adc_source is not None else (lambda ch, t: 0.0)
+        self.accel_sources = {}
+        self.gyro_sources = {}
+        self.default_accel = at_rest
+        self.default_gyro = no_rotation
+        self.dacs = []
+        self.i2c_buses = []
+
+        self._saved_modules = {}
+        self._saved_time = {}
+        self._saved_path = None
+        self.installed = False
+
+    # --- device configuration -------------------------------------------
+    def set_accel(self, source, bus=1, address=0x68, gyro=None):
+        self.accel_sources[(bus, address)] = source
+        if gyro is not None:
+            self.gyro_sources[(bus, address)] = gyro
+
+    def dac(self, address=0x62):
+        """The (last created) simulated MCP4725 at address."""
+        for d in reversed(self.dacs):
+            if d.address == address:
+                return d
+        raise LookupError(f"no MCP4725 at 0x{address:02x}")
+
+    # --- module fakes -----------------------------------------------------
+    def _build_modules(self):
+        backend = self
+
+        rpi = types.ModuleType("RPi")
+        rpi.GPIO = self.gpio
+
+        board = types.ModuleType("board")
+        for name in ("SCL", "SDA", "SCLK", "MOSI", "MISO", "CE0", "CE1"):
+            setattr(board, name, name)
+        for n in range(28):
+            setattr(board, f"D{n}", n)
+
+        def make_i2c(scl=None, sda=None, *, frequency=100000, bus=1):
+            bus_obj = SimI2C(backend, bus=bus, frequency=frequency)
+            backend.i2c_buses.append(bus_obj)
+            return bus_obj
+
+        busio = types.ModuleType("busio")
+        busio.I2C = make_i2c
+
+        extended = types.ModuleType("adafruit_extended_bus")
+        extended.ExtendedI2C = lambda bus_id, frequency=400000: make_i2c(bus=bus_id, frequency=frequency)
+
+        spidev = types.ModuleType("spidev")
+        spidev.SpiDev = lambda: SimSpiDev(backend)
+
+        mcp4725 = types.ModuleType("adafruit_mcp4725")
+        mcp4725.MCP4725 = SimMCP4725
+
+        mpu6050 = types.ModuleType("adafruit_mpu6050")
+        mpu6050.MPU6050 = SimMPU6050
+
+        return {
+            "RPi": rpi,
+            "RPi.GPIO": self.gpio,
+            "board": board,
+            "busio": busio,
+            "spidev": spidev,
+            "adafruit_mcp4725": mcp4725,
+            "adafruit_mpu6050": mpu6050,
+            "adafruit_extended_bus": extended,
+        }
+
+    # --- install / uninstall ----------------------------------------------
+    def install(self):
+        if self.installed:
+            return self
+        fakes = self._build_modules()
+        for name in _MODULES:
+            self._saved_modules[name] = sys.modules.get(name)
+            sys.modules[name] = fakes[name]
+        for name in _TIME_FUNCS:
+            self._saved_time[name] = getattr(time, name)
+            setattr(time, name, getattr(self.clock, name))
+        self._saved_path = list(sys.path)
+        self.installed = True
+        return self
+
+    def uninstall(self):
+        if not self.installed:
+            return
+        for name, mod in self._saved_modules.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
+        for name, fn in self._saved_time.items():
+            setattr(time, name, fn)
+        sys.path[:] = self._saved_path
+        self.installed = False
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    # --- loading lab scripts ----------------------------------------------
+    def load(self, path, name=None):
+        """Import a lab script (path relative to the repo root) as a fresh
+        module, with its directory on sys.path for sibling imports."""
+        if not self.installed:
+            raise RuntimeError("install() the backend before loading lab code")
+        path = os.path.join(REPO_ROOT, path)
+        lab_dir = os.path.dirname(path)
+        if lab_dir not in sys.path:
+            sys.path.insert(0, lab_dir)
+
+        # sibling modules imported earlier may hold the real time functions
+        for mod_name, mod in list(sys.modules.items()):
+            f = getattr(mod, "__file__", None)
+            if f and os.path.dirname(os.path.abspath(f)) == lab_dir:
+                del sys.modules[mod_name]
+
+        if name is None:
+            lab = os.path.basename(lab_dir).lower()
+            name = f"{lab}_{os.path.splitext(os.path.basename(path))[0]}"
+        spec = importlib.util.spec_from_file_location(name, path)
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[name] = mod
+        spec.loader.exec_module(mod)
+        return mod
@@ -0,0 +1,105 @@
+# clock.py
+# Virtual time for the simulated backend.
+#
+# Nothing in the labs waits on a real clock once the backend is installed:
+# sleep() just moves virtual time forward, so a 13 s traffic sequence or a
+# 2 s ADC capture finishes as fast as the Python code runs.
+#
+# read_cost lets busy-wait loops (Lab3 capture_samples spins on
+# perf_counter) make progress: every clock read advances time a little,
+# like the read itself would on the Pi.
+
+import heapq
+import itertools
+import threading
+
+
+# time.time() of virtual t=0, so timestamps still look like wall time
+EPOCH = 1_700_000_000.0
+
+
+class SimulationTimeout(Exception):
+    """Virtual time passed the clock's limit (stops loops that never return)."""
+
+
+class VirtualClock:
+    def __init__(self, start=0.0, read_cost=0.0, limit=None):
+        self._now = float(start)
+        self.read_cost = read_cost
+        self.limit = limit
+        self._timers = []
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+
+    # --- time module replacements ---------------------------------------
+    def monotonic(self):
+        if self.read_cost:
+            self.advance(self.read_cost)
+        return self._now
+
+    perf_counter = monotonic
+
+    def time(self):
+        return EPOCH + self.monotonic()
+
+    def monotonic_ns(self):
+        return int(self.monotonic() * 1e9)
+
+    perf_counter_ns = monotonic_ns
+
+    def time_ns(self):
+        return int(self.time() * 1e9)
+
+    def sleep(self, seconds):
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+        self.advance(seconds)
+
+    # --- control ----------------------------------------------------------
+    def now(self):
+        """Current virtual time without charging read_cost."""
+        return self._now
+
+    def advance(self, seconds):
+        self.advance_to(self._now + seconds)
+
+    def advance_to(self, t):
+        """Move time forward to t, firing any timers due on the way."""
+        with self._lock:
+            while self._timers and self._timers[0][0] <= t:
+                when, _, fn, args = heapq.heappop(self._timers)
+                if when > self._now:
+                    self._now = when
+                fn(*args)
+            if t > self._now:
+                self._now = t
+            if self.limit is not None and self._now > self.limit:
+                raise SimulationTimeout(f"virtual time {self._now:.6f}s > limit {self.limit}s")
+
+    def call_at(self, t, fn, *args):
+        """Run fn(*args) when virtual time reaches t (e.g. a button press)."""
+        with self._lock:
+            heapq.heappush(self._timers, (t, next(self._seq), fn, args))
+
+    def call_later(self, delay, fn, *args):
+        self.call_at(self._now + delay, fn, *args)
+
+    def next_timer(self):
+        with self._lock:
+            return self._timers[0][0] if self._timers else None
+
+
+def run_scheduler(clock, scheduler, until=None):
+    """Drive a Lab1 sequencer.Scheduler (or anything with next_deadline() /
+    run_pending()) on virtual time until it has nothing left, or `until`."""
+    while True:
+        nxt = scheduler.next_deadline()
+        timer = clock.next_timer()
+        if timer is not None and (nxt is None or timer < nxt):
+            nxt = timer
+        if nxt is None or (until is not None and nxt > until):
+            break
+        clock.advance_to(nxt)
+        scheduler.run_pending()
+    if until is not None:
+        clock.advance_to(until)
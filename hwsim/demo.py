@@ -0,0 +1,88 @@
+# demo.py
+# One timing-critical scenario from each lab on the simulated backend,
+# reporting virtual time covered vs wall time spent.
+#
+#   python3 -m hwsim.demo            (from the repo root)
+
+import math
+import time
+
+from .backend import Backend
+from .clock import VirtualClock, run_scheduler
+
+
+# captured before any backend patches the time module
+wall_clock = time.perf_counter
+
+
+def lab1_sequence(hw):
+    lab = hw.load("Lab1/traffic_light_interrupt.py")
+    lab.setup_gpio()
+    lab.set_rgb(lab.L1, "red")
+    lab.set_rgb(lab.L2, "green")
+    lab.GPIO.add_event_detect(lab.BUTTON, lab.GPIO.RISING, callback=lab.button_callback)
+    hw.gpio.schedule_press(hw.clock.now() + 1.0, lab.BUTTON)
+    run_scheduler(hw.clock, lab.scheduler, until=hw.clock.now() + 14.0)
+    st = lab.scheduler.stats.summary()
+    return f"{lab.sequencer.runs} sequence, {st['fired']} steps, max late {st['max_late_ms']:.3f} ms"
+
+
+def lab2_sine(hw):
+    lab = hw.load("Lab2/sin_wave.py")
+    dac = hw.dac()
+    n0 = len(dac.times)
+    t_end = hw.clock.now() + 2.0
+    lab.sin_wave(10.0, 3.0, lambda: hw.clock.now() >= t_end)
+    n = len(dac.times) - n0
+    return f"{n} DAC writes in 2 s ({n / 2.0:.0f} Hz of {lab.SAMPLE_RATE} Hz target)"
+
+
+def lab3_capture(hw):
+    hw.adc_source = lambda ch, t: 1.65 + 1.2 * math.sin(2 * math.pi * 12.5 * t)
+    lab = hw.load("Lab3/Control.py")
+    spi = lab.setup_spi_and_gpio()
+    x, fs = lab.capture_samples(spi, lab.SAMPLE_RATE, lab.CAPTURE_SECONDS)
+    f0, _, _ = lab.estimate_frequency_fft(x, fs)
+    shape, _ = lab.classify_waveform(x, fs)
+    return f"{len(x)} samples at {fs:.0f} Hz, f0={f0:.2f} Hz (true 12.50), shape={shape}"
+
+
+def lab4_walk(hw):
+    # 1.8 steps/s heel strikes on top of gravity
+    def walk(t):
+        u = (t * 1.8) % 1.0
+        bump = math.sin(math.pi * u / 0.3) if u < 0.3 else 0.0
+        return (0.0, 0.0, 9.81 + 2.5 * bump)
+
+    hw.set_accel(walk)
+    lab = hw.load("lab4/control.py")
+    lab.PRINT_EVERY_SEC = float("inf")
+    det = lab.make_detector()
+    lab.run(lab.setup_imu(), det, duration=20.0)
+    return f"{det.steps} steps in 20 s (true {int(20.0 * 1.8)}), cadence {det.cadence.frequency:.2f} Hz"
+
+
+# capture_samples busy-waits on perf_counter between samples; a coarser
+# clock read cost means fewer spins per sample (timing is still exact since
+# the measured rate comes from the same clock).
+SCENARIOS = [
+    ("Lab1 button sequence", lab1_sequence, 1e-6),
+    ("Lab2 sine 10 Hz", lab2_sine, 1e-6),
+    ("Lab3 2 s capture", lab3_capture, 1e-5),
+    ("Lab4 walking", lab4_walk, 1e-6),
+]
+
+
+def main():
+    for name, fn, read_cost in SCENARIOS:
+        with Backend(VirtualClock(read_cost=read_cost)) as hw:
+            t0 = hw.clock.now()
+            w0 = wall_clock()
+            result = fn(hw)
+            wall = wall_clock() - w0
+            virt = hw.clock.now() - t0
+        print(f"{name:22s} {virt:7.2f} s virtual in {1e3 * wall:8.1f} ms wall | {result}")
+
+
+if __name__ == "__main__":
+    main()
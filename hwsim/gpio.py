@@ -0,0 +1,185 @@
+# gpio.py
+# In-process stand-in for RPi.GPIO.
+#
+# Implements the calls the labs use. Output pins just record their level
+# (and every change is logged with its time); input pins are driven from
+# Python with set_input()/press()/release(), or scheduled on a
+# VirtualClock with schedule_input().
+#
+# clock=None runs on real time (threads + Condition waits, used by the
+# Lab1 input benchmark); with a VirtualClock, wait_for_edge() advances
+# virtual time to the next scheduled input instead of blocking.
+
+import threading
+import time
+
+
+BCM = 11
+BOARD = 10
+OUT = 0
+IN = 1
+LOW = 0
+HIGH = 1
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+
+class SimGPIO:
+    BCM = BCM
+    BOARD = BOARD
+    OUT = OUT
+    IN = IN
+    LOW = LOW
+    HIGH = HIGH
+    PUD_OFF = PUD_OFF
+    PUD_DOWN = PUD_DOWN
+    PUD_UP = PUD_UP
+    RISING = RISING
+    FALLING = FALLING
+    BOTH = BOTH
+
+    def __init__(self, clock=None, latency=0.0, log_outputs=False):
+        self.clock = clock
+        self.latency = latency          # s added per output()/input() call
+        self.log_outputs = log_outputs
+        self.log = []                   # (t, pin, level) if log_outputs
+        self.levels = {}
+        self.modes = {}
+        self.output_calls = 0
+        self.input_calls = 0
+        self._cond = threading.Condition()
+        self._edges = {}        # pin -> edges seen since wait_for_edge started
+        self._callbacks = {}    # pin -> (edge, callback)
+
+    def _now(self):
+        return self.clock.now() if self.clock is not None else time.monotonic()
+
+    def _charge(self):
+        if self.latency and self.clock is not None:
+            self.clock.advance(self.latency)
+
+    # setup
+    def setmode(self, mode):
+        pass
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, pin, mode, pull_up_down=PUD_OFF, initial=None):
+        pins = pin if isinstance(pin, (list, tuple)) else [pin]
+        for p in pins:
+            self.modes[p] = mode
+            if mode == IN:
+                self.levels[p] = HIGH if pull_up_down == PUD_UP else LOW
+            else:
+                self.levels[p] = initial if initial is not None else LOW
+
+    def cleanup(self, *args):
+        self.levels.clear()
+        self.modes.clear()
+        self._callbacks.clear()
+
+    # outputs
+    def output(self, pin, value):
+        self.output_calls += 1
+        self._charge()
+        if isinstance(pin, (list, tuple)):
+            if not isinstance(value, (list, tuple)):
+                value = [value] * len(pin)
+            pairs = zip(pin, value)
+        else:
+            pairs = [(pin, value)]
+        t = self._now()
+        for p, v in pairs:
+            level = HIGH if v else LOW
+            if self.log_outputs and self.levels.get(p) != level:
+                self.log.append((t, p, level))
+            self.levels[p] = level
+
+    # inputs
+    def input(self, pin):
+        self.input_calls += 1
+        self._charge()
+        return self.levels.get(pin, LOW)
+
+    def set_input(self, pin, level):
+        """Drive an input pin from the 'outside world'."""
+        callback = None
+        with self._cond:
+            old = self.levels.get(pin, LOW)
+            level = HIGH if level else LOW
+            self.levels[pin] = level
+            if old == level:
+                return
+            edge = RISING if level == HIGH else FALLING
+            self._edges.setdefault(pin, []).append(edge)
+            self._cond.notify_all()
+            cb = self._callbacks.get(pin)
+            if cb is not None and cb[0] in (edge, BOTH):
+                callback = cb[1]
+        if callback is not None:
+            callback(pin)
+
+    def press(self, pin):
+        self.set_input(pin, HIGH)
+
+    def release(self, pin):
+        self.set_input(pin, LOW)
+
+    def schedule_input(self, t, pin, level):
+        """Set an input pin at virtual time t (needs a VirtualClock)."""
+        self.clock.call_at(t, self.set_input, pin, level)
+
+    def schedule_press(self, t, pin, hold=0.1):
+        self.schedule_input(t, pin, HIGH)
+        self.schedule_input(t + hold, pin, LOW)
+
+    def _take_edge(self, pin, edge):
+        seen = self._edges.get(pin)
+        while seen:
+            e = seen.pop(0)
+            if edge == BOTH or e == edge:
+                self._edges[pin] = []
+                return True
+        return False
+
+    def wait_for_edge(self, pin, edge, bouncetime=None, timeout=None):
+        """timeout in ms like RPi.GPIO; returns pin, or None on timeout."""
+        if self.clock is not None:
+            return self._wait_for_edge_virtual(pin, edge, timeout)
+
+        end = None if timeout is None else time.monotonic() + timeout / 1000.0
+        with self._cond:
+            self._edges[pin] = []
+            while True:
+                if self._take_edge(pin, edge):
+                    return pin
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    return None
+                self._cond.wait(left)
+
+    def _wait_for_edge_virtual(self, pin, edge, timeout):
+        clock = self.clock
+        end = None if timeout is None else clock.now() + timeout / 1000.0
+        self._edges[pin] = []
+        while True:
+            nxt = clock.next_timer()
+            if nxt is None or (end is not None and nxt > end):
+                if end is None:
+                    raise RuntimeError("wait_for_edge without timeout and nothing scheduled")
+                clock.advance_to(end)
+                return pin if self._take_edge(pin, edge) else None
+            clock.advance_to(nxt)
+            if self._take_edge(pin, edge):
+                return pin
+
+    def add_event_detect(self, pin, edge, callback=None, bouncetime=None):
+        self._callbacks[pin] = (edge, callback)
+
+    def remove_event_detect(self, pin):
+        self._callbacks.pop(pin, None)
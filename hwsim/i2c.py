@@ -0,0 +1,139 @@
+# i2c.py
+# Simulated I2C bus plus the two I2C parts the labs use:
+#   MCP4725 DAC      (Lab2)   adafruit_mcp4725.MCP4725
+#   MPU6050 IMU      (Lab4)   adafruit_mpu6050.MPU6050
+#
+# Every transfer charges the bus time on the virtual clock:
+#   overhead + bytes * 9 bits / bus frequency
+# overhead models the Linux ioctl + driver path (~tens of us on a Pi).
+
+import bisect
+
+
+I2C_OVERHEAD = 60e-6    # s per transfer
+G = 9.80665
+
+
+class SimI2C:
+    """busio.I2C / adafruit_extended_bus.ExtendedI2C replacement."""
+
+    def __init__(self, backend, bus=1, frequency=100000):
+        self.backend = backend
+        self.bus = bus
+        self.frequency = frequency
+        self.transfers = 0
+        self.busy_time = 0.0
+
+    def transfer(self, nbytes):
+        dt = self.backend.i2c_overhead + nbytes * 9.0 / self.frequency
+        self.transfers += 1
+        self.busy_time += dt
+        self.backend.clock.advance(dt)
+
+    def deinit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.deinit()
+
+
+class SimMCP4725:
+    """12-bit DAC. value is 16-bit like the Adafruit driver (top 12 bits used).
+    Every write is logged as (t, volts); output_at(t) gives the analog
+    output at any virtual time."""
+
+    def __init__(self, i2c, *, address=0x62):
+        self.i2c = i2c
+        self.address = address
+        self.vdd = i2c.backend.vdd
+        self._code = 0
+        self.times = [i2c.backend.clock.now()]
+        self.volts = [0.0]
+        i2c.backend.dacs.append(self)
+
+    def _write(self, code12):
+        # fast-write command: address + 2 data bytes
+        self.i2c.transfer(3)
+        self._code = code12
+        t = self.i2c.backend.clock.now()
+        self.times.append(t)
+        self.volts.append(self.vdd * code12 / 4095.0)
+
+    @property
+    def value(self):
+        return self._code << 4
+
+    @value.setter
+    def value(self, val):
+        if not 0 <= val <= 65535:
+            raise ValueError("DAC value must be a 16-bit value (0-65535)")
+        self._write(val >> 4)
+
+    @property
+    def raw_value(self):
+        return self._code
+
+    @raw_value.setter
+    def raw_value(self, val):
+        if not 0 <= val <= 4095:
+            raise ValueError("DAC value must be a 12-bit value (0-4095)")
+        self._write(val)
+
+    @property
+    def normalized_value(self):
+        return self._code / 4095.0
+
+    @normalized_value.setter
+    def normalized_value(self, val):
+        if not 0.0 <= val <= 1.0:
+            raise ValueError("DAC value must be a float between 0 and 1")
+        self._write(int(val * 4095.0))
+
+    def output_at(self, t):
+        """Voltage on the DAC pin at virtual time t (zero-order hold)."""
+        i = bisect.bisect_right(self.times, t) - 1
+        return self.volts[i] if i >= 0 else 0.0
+
+
+class SimMPU6050:
+    """Accelerometer/gyro whose readings come from backend sources:
+    accel_source(t) -> (ax, ay, az) m/s^2, gyro_source(t) -> rad/s."""
+
+    def __init__(self, i2c, address=0x68):
+        self.i2c = i2c
+        self.address = address
+        backend = i2c.backend
+        key = (i2c.bus, address)
+        self.accel_source = backend.accel_sources.get(key, backend.default_accel)
+        self.gyro_source = backend.gyro_sources.get(key, backend.default_gyro)
+        self.reads = 0
+
+    def _read(self, source):
+        # register address write + 6 data bytes, repeated start: ~9 bytes
+        self.i2c.transfer(9)
+        self.reads += 1
+        return tuple(source(self.i2c.backend.clock.now()))
+
+    @property
+    def acceleration(self):
+        return self._read(self.accel_source)
+
+    @property
+    def gyro(self):
+        return self._read(self.gyro_source)
+
+    @property
+    def temperature(self):
+        self.i2c.transfer(4)
+        return 25.0
+
+
+def at_rest(t):
+    return (0.0, 0.0, G)
+
+
+def no_rotation(t):
+    return (0.0, 0.0, 0.0)
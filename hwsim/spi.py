@@ -0,0 +1,57 @@
+# spi.py
+# Simulated spidev.SpiDev with an MCP3008 10-bit ADC on every chip select.
+#
+# The analog input comes from the backend's adc_source(channel, t) -> volts,
+# sampled at the moment the transfer happens (virtual time). A transfer
+# charges overhead + bits / max_speed_hz on the clock.
+
+SPI_OVERHEAD = 15e-6    # s per xfer (ioctl + driver)
+
+
+class SimSpiDev:
+    def __init__(self, backend):
+        self.backend = backend
+        self.max_speed_hz = 500000
+        self.mode = 0
+        self.bits_per_word = 8
+        self.bus = None
+        self.device = None
+        self.transfers = 0
+
+    def open(self, bus, device):
+        self.bus = bus
+        self.device = device
+
+    def close(self):
+        self.bus = None
+
+    def _charge(self, nbytes):
+        backend = self.backend
+        backend.clock.advance(backend.spi_overhead + nbytes * 8.0 / self.max_speed_hz)
+
+    def xfer2(self, data):
+        if self.bus is None:
+            raise OSError("SPI device not open")
+        self.transfers += 1
+        self._charge(len(data))
+        return self._mcp3008(list(data))
+
+    xfer = xfer2
+
+    def readbytes(self, n):
+        self._charge(n)
+        return [0] * n
+
+    def writebytes(self, data):
+        self._charge(len(data))
+
+    def _mcp3008(self, data):
+        # start bit in byte 0, SGL/DIFF + channel in the top nibble of byte 1
+        if len(data) < 3 or not (data[0] & 0x01):
+            return [0] * len(data)
+        channel = (data[1] >> 4) & 0x07
+        backend = self.backend
+        v = backend.adc_source(channel, backend.clock.now())
+        vref = backend.vref
+        code = int(round(1023.0 * min(max(v, 0.0), vref) / vref))
+        return [0, (code >> 8) & 0x03, code & 0xFF] + [0] * (len(data) - 3)
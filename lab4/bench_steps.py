@@ -0,0 +1,220 @@
+# bench_steps.py
+# CSCE 462 - Lab 4: step counter accuracy + throughput benchmark
+#
+# Generates synthetic 3-axis accelerometer traces with a known number of
+# steps (walking, slow walking, running, stairs, noise/impulse artefacts,
+# standing still) at several sample rates, runs the step detector over them
+# and reports count error, per-sample processing time and samples/second.
+#
+# Run (no hardware needed):
+#   python3 bench_steps.py
+#   python3 bench_steps.py --save baseline.json       # record a baseline
+#   python3 bench_steps.py --compare baseline.json    # flag regressions
+
+import argparse
+import json
+import random
+from math import sin, cos, pi
+from time import perf_counter
+
+from step_detector import StepDetector
+from cadence import CadenceEstimator
+
+
+G = 9.81
+RATES = [50, 100, 200]
+SECONDS = 60.0
+SEED = 462
+
+# Regression limits for --compare
+MAX_EXTRA_ERROR = 2          # steps
+MAX_SLOWDOWN = 1.25          # x baseline us/sample
+
+
+# Gait segments: (duration fraction, step Hz, amplitude m/s^2, amplitude of every
+# other step relative to the first [1.0 = symmetric])
+SCENARIOS = {
+    "walk":        {"segments": [(1.0, 1.8, 2.5, 1.0)], "noise": 0.15},
+    "slow_walk":   {"segments": [(1.0, 1.2, 1.1, 1.0)], "noise": 0.10},
+    "run":         {"segments": [(1.0, 2.8, 7.0, 1.0)], "noise": 0.30},
+    "stairs":      {"segments": [(1.0, 1.4, 3.0, 0.55)], "noise": 0.20},
+    "noisy_walk":  {"segments": [(1.0, 1.8, 2.5, 1.0)], "noise": 0.60, "impulses": 0.3},
+    "still_bumps": {"segments": [(1.0, 0.0, 0.0, 1.0)], "noise": 0.10, "impulses": 0.5},
+    "mixed":       {"segments": [(0.4, 1.7, 2.2, 1.0), (0.2, 0.0, 0.0, 1.0),
+                                 (0.4, 2.7, 6.0, 1.0)], "noise": 0.20},
+}
+
+
+def step_pulse(u):
+    """Shape of one foot strike, u in [0, 1) over one step period:
+    sharp heel-strike peak, then a shallower push-off dip."""
+    if u < 0.30:
+        return sin(pi * u / 0.30)
+    if u < 0.75:
+        return -0.35 * sin(pi * (u - 0.30) / 0.45)
+    return 0.0
+
+
+def make_trace(scenario, fs, seconds, seed=SEED):
+    """Returns (t, ax, ay, az, true_steps)."""
+    rng = random.Random(f"{seed}-{scenario['segments']}-{fs}")
+    n = int(fs * seconds)
+    noise = scenario.get("noise", 0.0)
+    impulse_rate = scenario.get("impulses", 0.0)   # per second
+
+    # Fixed random sensor tilt: gravity and the vertical step signal both
+    # project onto all three axes.
+    tilt = rng.uniform(0.0, 0.6)
+    yaw = rng.uniform(0.0, 2 * pi)
+    ux, uy, uz = sin(tilt) * cos(yaw), sin(tilt) * sin(yaw), cos(tilt)
+
+    t = [i / fs for i in range(n)]
+    vert = [0.0] * n
+
+    # Lay down steps segment by segment with slight period/amplitude jitter
+    true_steps = 0
+    seg_start = 0.0
+    for frac, step_hz, amp, alt in scenario["segments"]:
+        seg_end = seg_start + frac * seconds
+        if step_hz > 0:
+            ts = seg_start
+            k = 0
+            while True:
+                period = (1.0 / step_hz) * rng.uniform(0.95, 1.05)
+                if ts + period > seg_end:
+                    break
+                a = amp * rng.uniform(0.85, 1.15) * (alt if k % 2 else 1.0)
+                i0 = int(ts * fs)
+                i1 = min(n, int((ts + period) * fs))
+                for i in range(i0, i1):
+                    vert[i] += a * step_pulse((t[i] - ts) / period)
+                true_steps += 1
+                ts += period
+                k += 1
+        seg_start = seg_end
+
+    # Knocks/bumps: short spikes that are not steps
+    if impulse_rate > 0:
+        n_imp = int(impulse_rate * seconds)
+        width = max(1, int(0.02 * fs))
+        for _ in range(n_imp):
+            i0 = rng.randrange(0, n - width)
+            a = rng.uniform(4.0, 8.0) * rng.choice((-1.0, 1.0))
+            for i in range(i0, i0 + width):
+                vert[i] += a
+
+    ax, ay, az = [], [], []
+    for i in range(n):
+        v = G + vert[i]
+        ax.append(v * ux + rng.gauss(0.0, noise))
+        ay.append(v * uy + rng.gauss(0.0, noise))
+        az.append(v * uz + rng.gauss(0.0, noise))
+    return t, ax, ay, az, true_steps
+
+
+DETECTORS = {
+    "fixed": lambda: StepDetector(),
+    "adaptive": lambda: StepDetector(cadence=CadenceEstimator()),
+}
+
+
+def run_detector(det, t, ax, ay, az):
+    update = det.update
+    t0 = perf_counter()
+    for i in range(len(t)):
+        update(t[i], ax[i], ay[i], az[i])
+    return det.steps, perf_counter() - t0
+
+
+def run_all(rates=RATES, seconds=SECONDS, seed=SEED, detectors=None):
+    results = []
+    for name, scenario in SCENARIOS.items():
+        for fs in rates:
+            t, ax, ay, az, truth = make_trace(scenario, fs, seconds, seed)
+            for det_name, factory in DETECTORS.items():
+                if detectors and det_name not in detectors:
+                    continue
+                counted, elapsed = run_detector(factory(), t, ax, ay, az)
+                n = len(t)
+                results.append({
+                    "scenario": name,
+                    "fs": fs,
+                    "detector": det_name,
+                    "truth": truth,
+                    "counted": counted,
+                    "error": counted - truth,
+                    "us_per_sample": 1e6 * elapsed / n,
+                    "samples_per_sec": n / elapsed if elapsed > 0 else 0.0,
+                })
+    return results
+
+
+def print_table(results):
+    print(f"{'scenario':12s} {'fs':>4s} {'detector':9s} {'truth':>5s} {'count':>5s} "
+          f"{'err':>5s} {'err%':>6s} {'us/samp':>8s} {'samp/s':>9s}")
+    for r in results:
+        # no steps to be a percentage of (still_bumps): the err column says it
+        pct = f"{100.0 * r['error'] / r['truth']:+6.1f}" if r["truth"] else f"{'-':>6s}"
+        print(f"{r['scenario']:12s} {r['fs']:4d} {r['detector']:9s} {r['truth']:5d} "
+              f"{r['counted']:5d} {r['error']:+5d} {pct} "
+              f"{r['us_per_sample']:8.2f} {r['samples_per_sec']:9.0f}")
+
+    for det_name in DETECTORS:
+        rows = [r for r in results if r["detector"] == det_name]
+        if not rows:
+            continue
+        abs_err = sum(abs(r["error"]) for r in rows)
+        truth = sum(r["truth"] for r in rows)
+        us = sum(r["us_per_sample"] for r in rows) / len(rows)
+        print(f"{det_name:9s} total |err| = {abs_err} / {truth} steps "
+              f"({100.0 * abs_err / max(1, truth):.1f}%), mean {us:.2f} us/sample")
+
+
+def compare(results, baseline):
+    """Returns a list of regression messages (empty = ok)."""
+    base = {(b["scenario"], b["fs"], b["detector"]): b for b in baseline}
+    problems = []
+    for r in results:
+        b = base.get((r["scenario"], r["fs"], r["detector"]))
+        if b is None:
+            continue
+        key = f"{r['scenario']}@{r['fs']}Hz/{r['detector']}"
+        if abs(r["error"]) > abs(b["error"]) + MAX_EXTRA_ERROR:
+            problems.append(f"{key}: error {r['error']:+d} (baseline {b['error']:+d})")
+        if r["us_per_sample"] > MAX_SLOWDOWN * b["us_per_sample"]:
+            problems.append(f"{key}: {r['us_per_sample']:.2f} us/sample "
+                            f"(baseline {b['us_per_sample']:.2f})")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Step detector benchmark on synthetic gait")
+    ap.add_argument("--seconds", type=float, default=SECONDS)
+    ap.add_argument("--rates", type=int, nargs="+", default=RATES)
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--detector", choices=list(DETECTORS), action="append")
+    ap.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    ap.add_argument("--compare", metavar="FILE", help="compare against a JSON baseline")
+    args = ap.parse_args()
+
+    results = run_all(args.rates, args.seconds, args.seed, args.detector)
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"\nbaseline written to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare(results, json.load(f))
+        if problems:
+            print("\nREGRESSIONS:")
+            for p in problems:
+                print("  " + p)
+            raise SystemExit(1)
+        print("\nno regressions vs baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# cadence.py
+# CSCE 462 - Lab 4: streaming cadence (step frequency) estimator
+#
+# Runs a small sliding-DFT bank over the "dyn" signal from the step counter.
+# The IMU loop does not sample at a fixed rate (sleep + I2C time), so input
+# samples are zero-order-held onto a fixed FS grid first. Each grid sample
+# costs O(K) where K is the number of DFT bins in the walking/running band
+# (~14 bins at the defaults) -- independent of the window length, so it is
+# constant per sample.
+#
+# Run this file directly to measure the per-sample cost on the target board:
+#   python3 cadence.py
+
+from math import cos, sin, pi, sqrt, ceil, floor
+
+
+# Defaults
+FS = 50.0             # Hz, internal resampling rate
+WINDOW_SEC = 4.0      # DFT window length (frequency resolution = 1/WINDOW_SEC)
+F_MIN = 0.6           # Hz, slowest cadence we care about
+F_MAX = 3.5           # Hz, fastest (sprinting)
+HOP = 5               # re-pick the peak every HOP grid samples
+MIN_CONFIDENCE = 0.25 # peak power / band power needed to report a cadence
+DAMPING = 0.9999      # keeps the recursive DFT numerically stable
+
+
+def parabolic_interpolation(mags, k):
+    # same 3-point peak refinement as Lab3/Control.py
+    if k <= 0 or k >= len(mags) - 1:
+        return 0.0
+    a = mags[k - 1]
+    b = mags[k]
+    c = mags[k + 1]
+    denom = (a - 2*b + c)
+    if denom == 0:
+        return 0.0
+    return 0.5 * (a - c) / denom
+
+
+class CadenceEstimator:
+    """
+    Sliding DFT over a WINDOW_SEC window of the dynamic acceleration.
+
+    update(t, x) accepts samples at any (irregular) rate. After enough data
+    has been seen, .frequency is the dominant step frequency in Hz (0.0 if
+    not locked), .amplitude is the amplitude of that component, and
+    .confidence is the fraction of band power in the peak.
+    """
+
+    def __init__(self, fs=FS, window_sec=WINDOW_SEC, f_min=F_MIN, f_max=F_MAX,
+                 hop=HOP, min_confidence=MIN_CONFIDENCE, damping=DAMPING):
+        self.fs = float(fs)
+        self.dt = 1.0 / self.fs
+        self.n = int(round(self.fs * window_sec))
+        self.hop = max(1, int(hop))
+        self.min_confidence = min_confidence
+
+        # Band bins, plus one guard bin each side for the Hann window
+        k_lo = max(1, int(ceil(f_min * self.n / self.fs)))
+        k_hi = min(self.n // 2 - 1, int(floor(f_max * self.n / self.fs)))
+        self.k_first = k_lo - 1
+        self.k_count = (k_hi + 1) - self.k_first + 1
+
+        self._r_n = damping ** self.n
+        self._tw_re = []
+        self._tw_im = []
+        for i in range(self.k_count):
+            w = 2.0 * pi * (self.k_first + i) / self.n
+            self._tw_re.append(damping * cos(w))
+            self._tw_im.append(damping * sin(w))
+        self._re = [0.0] * self.k_count
+        self._im = [0.0] * self.k_count
+
+        self._buf = [0.0] * self.n
+        self._idx = 0
+        self._filled = 0
+        self._since_pick = 0
+        self._t_next = None
+
+        self.frequency = 0.0
+        self.amplitude = 0.0
+        self.confidence = 0.0
+
+    @property
+    def locked(self):
+        return self.frequency > 0.0
+
+    @property
+    def period(self):
+        return 1.0 / self.frequency if self.frequency > 0.0 else 0.0
+
+    def reset(self):
+        self._re = [0.0] * self.k_count
+        self._im = [0.0] * self.k_count
+        self._buf = [0.0] * self.n
+        self._idx = 0
+        self._filled = 0
+        self._since_pick = 0
+        self._t_next = None
+        self.frequency = self.amplitude = self.confidence = 0.0
+
+    def update(self, t, x):
+        """Feed one sample taken at time t (seconds). Returns True if the
+        estimate was refreshed."""
+        if self._t_next is None:
+            self._t_next = t
+
+        # A long stall (e.g. I2C hiccup) would otherwise replay up to the
+        # whole window; anything beyond one window is the same as a restart.
+        if t - self._t_next > self.n * self.dt:
+            self._t_next = t - self.n * self.dt
+
+        refreshed = False
+        while t >= self._t_next:
+            self._t_next += self.dt
+            self._push(x)
+            self._since_pick += 1
+            if self._since_pick >= self.hop and self._filled >= self.n:
+                self._since_pick = 0
+                self._pick_peak()
+                refreshed = True
+        return refreshed
+
+    def _push(self, x):
+        old = self._buf[self._idx]
+        self._buf[self._idx] = x
+        self._idx += 1
+        if self._idx == self.n:
+            self._idx = 0
+        if self._filled < self.n:
+            self._filled += 1
+
+        delta = x - self._r_n * old
+        re = self._re
+        im = self._im
+        tw_re = self._tw_re
+        tw_im = self._tw_im
+        for i in range(self.k_count):
+            a = re[i] + delta
+            b = im[i]
+            c = tw_re[i]
+            s = tw_im[i]
+            re[i] = a * c - b * s
+            im[i] = a * s + b * c
+
+    def _pick_peak(self):
+        # Hann window applied in the frequency domain:
+        #   X_hann[k] = 0.5 X[k] - 0.25 (X[k-1] + X[k+1])
+        re = self._re
+        im = self._im
+        mags = []
+        total = 0.0
+        for i in range(1, self.k_count - 1):
+            hr = 0.5 * re[i] - 0.25 * (re[i - 1] + re[i + 1])
+            hi = 0.5 * im[i] - 0.25 * (im[i - 1] + im[i + 1])
+            p = hr*hr + hi*hi
+            total += p
+            mags.append(sqrt(p))
+
+        if total <= 0.0:
+            self.frequency = self.amplitude = self.confidence = 0.0
+            return
+
+        k = max(range(len(mags)), key=mags.__getitem__)
+
+        # An asymmetric gait (stairs, foot-mounted sensor) can put more
+        # energy at the stride frequency than the step frequency. If the
+        # 2nd harmonic is nearly as strong, the step rate is the harmonic.
+        k2 = 2 * k + self.k_first + 1
+        if k2 < len(mags) and mags[k2] >= 0.6 * mags[k]:
+            k = k2
+
+        delta = parabolic_interpolation(mags, k)
+        self.confidence = (mags[k] * mags[k]) / total
+        if self.confidence < self.min_confidence:
+            self.frequency = self.amplitude = 0.0
+            return
+
+        # Hann coherent gain is 0.5, and a real sinusoid splits its energy
+        # between +f and -f.
+        self.frequency = (self.k_first + 1 + k + delta) * self.fs / self.n
+        self.amplitude = 4.0 * mags[k] / self.n
+
+
+if __name__ == "__main__":
+    # Per-sample cost on this machine, fed at a realistic IMU loop rate
+    from time import perf_counter
+
+    loop_hz = 150.0
+    f_step = 1.8
+    seconds = 60.0
+    est = CadenceEstimator()
+
+    n = int(loop_hz * seconds)
+    xs = [1.5 * sin(2.0 * pi * f_step * i / loop_hz) for i in range(n)]
+
+    t0 = perf_counter()
+    for i in range(n):
+        est.update(i / loop_hz, xs[i])
+    elapsed = perf_counter() - t0
+
+    per_sample = elapsed / n
+    print(f"bins={est.k_count} window={est.n} samples @ {est.fs:.0f} Hz")
+    print(f"estimate={est.frequency:.3f} Hz (true {f_step:.3f}) "
+          f"amp={est.amplitude:.2f} conf={est.confidence:.2f}")
+    print(f"cost: {per_sample * 1e6:.1f} us/sample "
+          f"({100.0 * per_sample * loop_hz:.2f}% of a {loop_hz:.0f} Hz loop budget)")
@@ -9,96 +9,92 @@ import board
 import busio
 import adafruit_mpu6050
 from time import perf_counter, sleep
-from math import sqrt
 
+import labpath  # noqa: F401
+from metrics import LoopMetrics, REGISTRY, setup_from_env
+from realtime import from_env as realtime_from_env
+from step_detector import make_detector
 
-# User-tunable parameters
 
-PRINT_EVERY_SEC = 0.20    
-ALPHA = 0.15             
-REFRACTORY_SEC = 0.30   
+# User-tunable parameters (detector thresholds: step_detector.py)
 
-# Peak detection thresholds (tune for your sensor placement)
-# We'll detect peaks on "dynamic magnitude" = |a| - baseline(gravity-ish)
-# Start with these, then tune while watching the debug values.
-THRESH_HIGH = 1.25        
-THRESH_LOW  = 0.55       
+PRINT_EVERY_SEC = 0.20
 
+# Per-sample loop, detector and step metrics
+LOOP = LoopMetrics("lab4_imu")
+DET_TIME = REGISTRY.histogram("lab4_detector_seconds", "StepDetector.update time per sample")
+STEPS = REGISTRY.gauge("lab4_steps", "steps counted so far")
+CADENCE = REGISTRY.gauge("lab4_cadence_hz", "current cadence estimate")
 
-# Setup IMU
-i2c = busio.I2C(board.SCL, board.SDA)
-mpu = adafruit_mpu6050.MPU6050(i2c)
-
-
-# Helpers
-def lpf(prev, x, alpha):
-    return prev + alpha * (x - prev)
-
-
-# Main loop state
-t_last = perf_counter()
-t_last_print = t_last
-t_last_step = -1e9
-
-# Filtered acceleration components
-fax = fay = faz = 0.0
-
-# Baseline magnitude (captures gravity + slow drift)
-base_mag = 9.8
-
-# Step detection state machine
-armed = True  
-
-steps = 0
-
-print("Starting MPU6050 read + step counting...")
-print("Tip: Hold the sensor steady against your body (pocket/hand/chest) while walking.\n")
-
-while True:
-    now = perf_counter()
-    dt = now - t_last
-    t_last = now
+# Applied around run() when LAB_RT=1
+RT = realtime_from_env()
 
-    ax, ay, az = mpu.acceleration   
-    gx, gy, gz = mpu.gyro          
 
-    # Low-pass filter accel components
-    fax = lpf(fax, ax, ALPHA)
-    fay = lpf(fay, ay, ALPHA)
-    faz = lpf(faz, az, ALPHA)
-
-    # Magnitude of filtered acceleration
-    mag = sqrt(fax*fax + fay*fay + faz*faz)
-
-    # Baseline gravity estimate (very slow low-pass)
-    base_mag = lpf(base_mag, mag, 0.01)
-
-    # Dynamic component (removes gravity-ish part)
-    dyn = mag - base_mag
-
-
-    # Step detection (peak + hysteresis + refractory)
-
-    # Logic:
-    if armed:
-        if dyn > THRESH_HIGH and (now - t_last_step) > REFRACTORY_SEC:
-            steps += 1
-            t_last_step = now
-            armed = False
-    else:
-        if dyn < THRESH_LOW:
-            armed = True
-
-
-    # Print status periodically
-    if (now - t_last_print) >= PRINT_EVERY_SEC:
-        t_last_print = now
-        print(
-            f"steps={steps:3d} | "
-            f"acc(m/s^2)=({ax:+6.2f},{ay:+6.2f},{az:+6.2f}) | "
-            f"|a|={mag:5.2f} base={base_mag:5.2f} dyn={dyn:+5.2f} | "
-            f"gyro=({gx:+6.2f},{gy:+6.2f},{gz:+6.2f})"
-        )
-
-    # Small sleep to reduce CPU load (still plenty fast for walking)
-    sleep(0.005)
\ No newline at end of file
+# Setup IMU
+def setup_imu():
+    i2c = busio.I2C(board.SCL, board.SDA)
+    return adafruit_mpu6050.MPU6050(i2c)
+
+
+def run(mpu, det, duration=None):
+    """Sample + detect forever, or for `duration` seconds."""
+    t_start = t_last_print = perf_counter()
+
+    n_samples = 0
+    n_at_print = 0
+    LOOP.restart()
+
+    while duration is None or perf_counter() - t_start < duration:
+        now = perf_counter()
+        LOOP.tick(now)
+
+        ax, ay, az = mpu.acceleration
+        gx, gy, gz = mpu.gyro
+        t0 = perf_counter()
+        LOOP.io(t0 - now)
+
+        # Detector cost, so we can see how much of the loop budget it uses
+        det.update(now, ax, ay, az)
+        DET_TIME.record(perf_counter() - t0)
+        n_samples += 1
+
+        # Print status periodically
+        if (now - t_last_print) >= PRINT_EVERY_SEC:
+            rate = (n_samples - n_at_print) / (now - t_last_print)
+            t_last_print = now
+            n_at_print = n_samples
+            cad = det.cadence.frequency if det.cadence is not None else 0.0
+            STEPS.set(det.steps)
+            CADENCE.set(cad)
+            print(
+                f"steps={det.steps:3d} | "
+                f"acc(m/s^2)=({ax:+6.2f},{ay:+6.2f},{az:+6.2f}) | "
+                f"|a|={det.mag:5.2f} base={det.base_mag:5.2f} dyn={det.dyn:+5.2f} | "
+                f"gyro=({gx:+6.2f},{gy:+6.2f},{gz:+6.2f}) | "
+                f"cad={cad:4.2f}Hz hi={det.thresh_high:4.2f} refr={det.refractory_sec:4.2f} | "
+                f"{rate:5.1f}Hz det={1e6 * DET_TIME.mean:5.1f}us"
+            )
+
+        # Small sleep to reduce CPU load (still plenty fast for walking)
+        sleep(0.005)
+
+
+def main():
+    mpu = setup_imu()
+    det = make_detector()
+    instrumentation = setup_from_env()
+
+    print("Starting MPU6050 read + step counting...")
+    print("Tip: Hold the sensor steady against your body (pocket/hand/chest) while walking.\n")
+
+    try:
+        with RT:
+            if RT.enabled:
+                print(RT.describe())
+            run(mpu, det)
+    finally:
+        instrumentation.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# labpath.py
+# Puts the repo root on sys.path so the scripts in this directory can use
+# the shared packages (metrics, realtime, hwsim) when run from here, e.g.
+# "cd lab4 && python3 control.py". Import it before any of them:
+#
+#   import labpath  # noqa: F401
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,323 @@
+# multi_imu.py
+# CSCE 462 - Lab 4: several MPU6050s (both feet + hip) sampled on one timeline
+#
+# Each I2C bus gets its own worker thread (sensors on the same bus have to
+# take turns anyway; different buses run in parallel since the I2C ioctl
+# releases the GIL). All workers follow one shared tick schedule
+#   tick k  ->  deadline = t0 + k / RATE_HZ
+# and stamp every read with the midpoint of the transfer, so samples from
+# different sensors can be lined up by tick index.
+#
+# Every sensor runs its own StepDetector; the step events are fused into one
+# count (a step seen by the hip and a foot at about the same time is one step).
+# A step needs FUSE_MIN_VOTES worth of agreeing sensors, so a knock on one
+# sensor alone isn't counted.
+#
+# Ticks every sensor has reported are kept as aligned rows
+# (AcquisitionManager.aligned()): same tick index, each sensor's own read
+# timestamp. Alignment is by tick only; nothing is resampled or interpolated.
+#
+# Extra buses on a Pi: add e.g. "dtoverlay=i2c-gpio,bus=3,i2c_gpio_sda=23,
+# i2c_gpio_scl=24" to /boot/config.txt and
+#   sudo pip3 install adafruit-extended-bus
+# Run:
+#   python3 multi_imu.py
+
+import threading
+from collections import deque, namedtuple
+from time import perf_counter, sleep
+
+import labpath  # noqa: F401
+from metrics import ALL_THREADS, LoopMetrics, setup_from_env
+from step_detector import make_detector
+
+
+# Sensor layout: name, Linux I2C bus number, address (AD0 low=0x68, high=0x69)
+SensorSpec = namedtuple("SensorSpec", ["name", "bus", "address"])
+
+SENSORS = [
+    SensorSpec("left_foot", 1, 0x68),
+    SensorSpec("right_foot", 1, 0x69),
+    SensorSpec("hip", 3, 0x68),
+]
+
+RATE_HZ = 100.0
+PRINT_EVERY_SEC = 1.0
+FUSE_WINDOW_SEC = 0.15   # events from different sensors closer than this = one step
+FUSE_MIN_VOTES = 2.0     # summed weight of sensors that must agree on a step
+FUSE_WEIGHTS = {}        # sensor name -> vote weight (default 1.0), e.g. {"hip": 0.5}
+ALIGNED_KEEP = 256       # complete ticks kept for aligned()
+DEFAULT_BUS = 1          # the bus on the header SCL/SDA pins
+
+
+def open_bus(bus_id):
+    if bus_id == DEFAULT_BUS:
+        import board
+        import busio
+        return busio.I2C(board.SCL, board.SDA, frequency=400000)
+    from adafruit_extended_bus import ExtendedI2C
+    return ExtendedI2C(bus_id)
+
+
+def open_sensors(specs=SENSORS):
+    """Returns [(spec, MPU6050)], opening each bus only once."""
+    import adafruit_mpu6050
+
+    buses = {}
+    out = []
+    for spec in specs:
+        if spec.bus not in buses:
+            buses[spec.bus] = open_bus(spec.bus)
+        out.append((spec, adafruit_mpu6050.MPU6050(buses[spec.bus], address=spec.address)))
+    return out
+
+
+class StepFusion:
+    """
+    Merges step events from several detectors. Events are clustered by time;
+    a cluster closes once nothing new has landed in it for `window` seconds
+    (plus `hold` to allow for a bus worker reporting late). A closed cluster
+    is a step if the weights of the distinct sensors in it add up to at
+    least `min_votes`; otherwise it is counted in `rejected`.
+    """
+
+    def __init__(self, window=FUSE_WINDOW_SEC, hold=0.05, min_votes=FUSE_MIN_VOTES,
+                 weights=None):
+        self.window = window
+        self.hold = hold
+        self.min_votes = min_votes
+        self.weights = dict(FUSE_WEIGHTS if weights is None else weights)
+        self.steps = 0
+        self.rejected = 0
+        self.votes = {}          # sensor name -> number of fused steps it took part in
+        self._pending = []       # (t, name), unsorted, not yet fused
+        self._lock = threading.Lock()
+
+    def add(self, name, t):
+        with self._lock:
+            self._pending.append((t, name))
+
+    def flush(self, now):
+        """Fuse every cluster that can no longer grow. Returns the number of
+        new fused steps."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            self._pending.sort()
+            new = 0
+            start = 0
+            while start < len(self._pending):
+                end = start + 1
+                while (end < len(self._pending)
+                       and self._pending[end][0] - self._pending[end - 1][0] <= self.window):
+                    end += 1
+                if now - self._pending[end - 1][0] <= self.window + self.hold:
+                    break   # newest cluster may still grow
+                names = {n for _, n in self._pending[start:end]}
+                if sum(self.weights.get(n, 1.0) for n in names) >= self.min_votes - 1e-9:
+                    for name in names:
+                        self.votes[name] = self.votes.get(name, 0) + 1
+                    new += 1
+                else:
+                    self.rejected += 1
+                start = end
+            del self._pending[:start]
+            self.steps += new
+            return new
+
+
+class SensorState:
+    def __init__(self, index, spec, device, detector):
+        self.index = index
+        self.spec = spec
+        self.device = device
+        self.detector = detector
+        self.samples = 0
+        self.missed_ticks = 0
+        self.read_time = 0.0     # total seconds spent in I2C reads
+        self.last_tick = -1
+        self.last_t = 0.0
+
+
+class AcquisitionManager:
+    """
+    Samples N sensors on a common timeline with one worker thread per bus.
+
+    stats() reports per-sensor achieved rate and inter-sensor skew (spread of
+    the read timestamps of the same tick across all sensors). aligned()
+    returns the most recent ticks that every sensor reported.
+
+    Without an explicit fusion, min_votes is capped at the number of sensors
+    so a single-sensor setup still counts steps.
+    """
+
+    def __init__(self, sensors, rate_hz=RATE_HZ, detector_factory=make_detector,
+                 fusion=None):
+        self.period = 1.0 / rate_hz
+        self.sensors = [SensorState(i, spec, dev, detector_factory())
+                        for i, (spec, dev) in enumerate(sensors)]
+        if fusion is None:
+            fusion = StepFusion(min_votes=min(FUSE_MIN_VOTES, len(self.sensors)))
+        self.fusion = fusion
+
+        self._by_bus = {}
+        for s in self.sensors:
+            self._by_bus.setdefault(s.spec.bus, []).append(s)
+
+        self._stop = threading.Event()
+        self._threads = []
+        self.t0 = 0.0
+
+        # tick -> [(t, ax, ay, az) or None per sensor], until every sensor has
+        # reported; complete ticks move to self._aligned
+        self._tick_rows = {}
+        self._aligned = deque(maxlen=ALIGNED_KEEP)
+        self.incomplete_ticks = 0
+        self._tick_lock = threading.Lock()
+        self.skew_n = 0
+        self.skew_sum = 0.0
+        self.skew_max = 0.0
+
+    def start(self):
+        # small lead so every worker is waiting before tick 0
+        self.t0 = perf_counter() + 0.05
+        self._stop.clear()
+        for bus, states in self._by_bus.items():
+            th = threading.Thread(target=self._worker, args=(states,),
+                                  name=f"imu-bus{bus}", daemon=True)
+            self._threads.append(th)
+            th.start()
+
+    def stop(self):
+        self._stop.set()
+        for th in self._threads:
+            th.join()
+        self._threads = []
+        self.fusion.flush(float("inf"))
+
+    def _worker(self, states):
+        period = self.period
+        t0 = self.t0
+        tick = 0
+        # one loop per bus; a tick more than a period late is a miss
+        loop = LoopMetrics(f"lab4_imu_bus{states[0].spec.bus}", tolerance=period)
+        while not self._stop.is_set():
+            deadline = due = t0 + tick * period
+            now = perf_counter()
+            if now < deadline:
+                sleep(deadline - now)
+            elif now - deadline >= period:
+                # fell behind (slow bus / preempted): rejoin the timeline at
+                # the current tick rather than bursting to catch up
+                skipped = int((now - deadline) / period)
+                for s in states:
+                    s.missed_ticks += skipped
+                tick += skipped
+                deadline = t0 + tick * period
+                # every skipped tick is a miss; late() below counts the first
+                loop.misses.value += skipped - 1
+
+            start = perf_counter()
+            loop.tick(start)
+            # against the tick that was due, so a stall shows its full length
+            loop.late(start - due)
+            for s in states:
+                r0 = perf_counter()
+                ax, ay, az = s.device.acceleration
+                r1 = perf_counter()
+                t = 0.5 * (r0 + r1)
+                loop.io(r1 - r0)
+
+                s.read_time += r1 - r0
+                s.samples += 1
+                s.last_tick = tick
+                s.last_t = t
+                if s.detector.update(t, ax, ay, az):
+                    self.fusion.add(s.spec.name, t)
+                self._record_tick(tick, s.index, (t, ax, ay, az))
+            tick += 1
+
+    def _record_tick(self, tick, index, sample):
+        n = len(self.sensors)
+        with self._tick_lock:
+            row = self._tick_rows.get(tick)
+            if row is None:
+                row = self._tick_rows[tick] = [None] * n
+            row[index] = sample
+            if all(r is not None for r in row):
+                del self._tick_rows[tick]
+                self._aligned.append((tick, row))
+                ts = [r[0] for r in row]
+                skew = max(ts) - min(ts)
+                self.skew_n += 1
+                self.skew_sum += skew
+                if skew > self.skew_max:
+                    self.skew_max = skew
+            # drop ticks some sensor skipped; they can never complete
+            if len(self._tick_rows) > 64:
+                for k in sorted(self._tick_rows)[:-32]:
+                    del self._tick_rows[k]
+                    self.incomplete_ticks += 1
+
+    def aligned(self, n=None):
+        """The last n (default: all kept) complete ticks, oldest first, as
+        [(tick, {sensor name: (t, ax, ay, az)})]."""
+        names = [s.spec.name for s in self.sensors]
+        with self._tick_lock:
+            rows = list(self._aligned)
+        if n is not None:
+            rows = rows[-n:]
+        return [(tick, dict(zip(names, row))) for tick, row in rows]
+
+    def stats(self, now=None):
+        if now is None:
+            now = perf_counter()
+        elapsed = max(1e-9, now - self.t0)
+        per_sensor = {}
+        for s in self.sensors:
+            per_sensor[s.spec.name] = {
+                "rate_hz": s.samples / elapsed,
+                "target_hz": 1.0 / self.period,
+                "missed_ticks": s.missed_ticks,
+                "read_ms": 1e3 * s.read_time / s.samples if s.samples else 0.0,
+                "steps": s.detector.steps,
+            }
+        with self._tick_lock:
+            skew_mean = self.skew_sum / self.skew_n if self.skew_n else 0.0
+            skew_max = self.skew_max
+        return {
+            "sensors": per_sensor,
+            "skew_mean_ms": 1e3 * skew_mean,
+            "skew_max_ms": 1e3 * skew_max,
+            "fused_steps": self.fusion.steps,
+            "rejected_steps": self.fusion.rejected,
+            "incomplete_ticks": self.incomplete_ticks,
+        }
+
+
+def main():
+    mgr = AcquisitionManager(open_sensors(SENSORS))
+
+    print(f"Sampling {len(mgr.sensors)} IMUs on {len(mgr._by_bus)} bus(es) at {RATE_HZ:.0f} Hz...")
+    mgr.start()
+    # profile every thread: the reads run on one worker per bus
+    instrumentation = setup_from_env(thread_id=ALL_THREADS)
+    try:
+        while True:
+            sleep(PRINT_EVERY_SEC)
+            mgr.fusion.flush(perf_counter())
+            st = mgr.stats()
+            parts = [
+                f"{name}: {s['steps']:3d} steps {s['rate_hz']:5.1f}Hz "
+                f"miss={s['missed_ticks']} read={s['read_ms']:.2f}ms"
+                for name, s in st["sensors"].items()
+            ]
+            print(f"fused={st['fused_steps']:3d} rejected={st['rejected_steps']} | skew mean={st['skew_mean_ms']:.2f}ms "
+                  f"max={st['skew_max_ms']:.2f}ms | " + " | ".join(parts))
+    finally:
+        mgr.stop()
+        instrumentation.stop()
+
+
+if __name__ == "__main__":
+    main()
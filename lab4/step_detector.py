@@ -0,0 +1,135 @@
+# step_detector.py
+# CSCE 462 - Lab 4: peak + hysteresis + refractory step detector
+#
+# Same filter chain and state machine that used to live inline in
+# control.py, so it can be fed from the live IMU or from a recorded trace.
+# If a CadenceEstimator is attached, the refractory window and the
+# thresholds follow the current step frequency / amplitude instead of
+# being fixed.
+#
+# make_detector() builds the detector control.py and multi_imu.py both use,
+# from the tunable values below (they used to live in control.py).
+
+from math import sqrt
+
+from cadence import CadenceEstimator
+
+
+# User-tunable parameters
+ALPHA = 0.15
+BASE_ALPHA = 0.01
+REFRACTORY_SEC = 0.30
+
+# Peak detection thresholds (tune for your sensor placement)
+# We'll detect peaks on "dynamic magnitude" = |a| - baseline(gravity-ish)
+# Start with these, then tune while watching the debug values.
+THRESH_HIGH = 1.25
+THRESH_LOW = 0.55
+
+# Adapt refractory window + thresholds to the measured cadence.
+# Set False to get the plain fixed-threshold detector.
+ADAPTIVE = True
+
+# Adaptive mode
+REFRACTORY_FRAC = 0.6      # refractory = this fraction of one step period
+REFRACTORY_MIN = 0.18      # s, never shorter than this (~5.5 steps/s)
+REFRACTORY_MAX = 0.80      # s
+HIGH_FRAC = 0.45           # high threshold = this fraction of step amplitude
+HIGH_FLOOR = 0.35          # m/s^2, don't chase sensor noise
+HIGH_CEIL = 4.0            # m/s^2
+
+
+def lpf(prev, x, alpha):
+    return prev + alpha * (x - prev)
+
+
+class StepDetector:
+    """
+    update(t, ax, ay, az) once per IMU sample; returns True when a step is
+    counted. .steps is the running total, .mag/.base_mag/.dyn are the
+    intermediate signals for debug printing.
+    """
+
+    def __init__(self, alpha=ALPHA, refractory_sec=REFRACTORY_SEC,
+                 thresh_high=THRESH_HIGH, thresh_low=THRESH_LOW,
+                 base_alpha=BASE_ALPHA, cadence=None):
+        self.alpha = alpha
+        self.base_alpha = base_alpha
+        self.cadence = cadence
+
+        # fixed settings; also the fallback while the cadence is not locked
+        self.refractory_fixed = refractory_sec
+        self.thresh_high_fixed = thresh_high
+        self.thresh_low_fixed = thresh_low
+
+        # currently in use
+        self.refractory_sec = refractory_sec
+        self.thresh_high = thresh_high
+        self.thresh_low = thresh_low
+
+        # Filtered acceleration components
+        self.fax = self.fay = self.faz = 0.0
+        # Baseline magnitude (captures gravity + slow drift)
+        self.base_mag = 9.8
+        self.mag = 0.0
+        self.dyn = 0.0
+
+        self.armed = True
+        self.t_last_step = -1e9
+        self.steps = 0
+
+    def update(self, t, ax, ay, az):
+        # Low-pass filter accel components
+        self.fax = lpf(self.fax, ax, self.alpha)
+        self.fay = lpf(self.fay, ay, self.alpha)
+        self.faz = lpf(self.faz, az, self.alpha)
+
+        # Magnitude of filtered acceleration
+        self.mag = sqrt(self.fax*self.fax + self.fay*self.fay + self.faz*self.faz)
+
+        # Baseline gravity estimate (very slow low-pass)
+        self.base_mag = lpf(self.base_mag, self.mag, self.base_alpha)
+
+        # Dynamic component (removes gravity-ish part)
+        dyn = self.dyn = self.mag - self.base_mag
+
+        if self.cadence is not None and self.cadence.update(t, dyn):
+            self._adapt()
+
+        # Step detection (peak + hysteresis + refractory)
+        if self.armed:
+            if dyn > self.thresh_high and (t - self.t_last_step) > self.refractory_sec:
+                self.steps += 1
+                self.t_last_step = t
+                self.armed = False
+                return True
+        else:
+            if dyn < self.thresh_low:
+                self.armed = True
+        return False
+
+    def _adapt(self):
+        c = self.cadence
+        if not c.locked:
+            self.refractory_sec = self.refractory_fixed
+            self.thresh_high = self.thresh_high_fixed
+            self.thresh_low = self.thresh_low_fixed
+            return
+
+        # Shorter lockout when stepping fast, longer when slow so a noisy
+        # double peak within one step is not counted twice.
+        refr = REFRACTORY_FRAC * c.period
+        self.refractory_sec = min(REFRACTORY_MAX, max(REFRACTORY_MIN, refr))
+
+        # Track the step amplitude so soft steps still cross the high
+        # threshold; keep the fixed high/low ratio for the hysteresis.
+        high = min(HIGH_CEIL, max(HIGH_FLOOR, HIGH_FRAC * c.amplitude))
+        self.thresh_high = high
+        self.thresh_low = high * (self.thresh_low_fixed / self.thresh_high_fixed)
+
+
+def make_detector(adaptive=ADAPTIVE):
+    cadence = CadenceEstimator() if adaptive else None
+    return StepDetector(alpha=ALPHA, refractory_sec=REFRACTORY_SEC,
+                        thresh_high=THRESH_HIGH, thresh_low=THRESH_LOW,
+                        cadence=cadence)
@@ -0,0 +1,46 @@
+# metrics - low-overhead instrumentation shared by the labs.
+#
+#   from metrics import LoopMetrics
+#   m = LoopMetrics("lab3_capture", tolerance=dt)
+#   ... in the loop: m.tick(now); m.io(read_time); m.late(now - deadline)
+#
+# Export is opt-in from the environment, so nothing changes unless asked:
+#   LAB_METRICS_FILE=/tmp/lab2.prom   (or .json) write every LAB_METRICS_INTERVAL s
+#   LAB_PROFILE=/tmp/lab2.folded      sample the loop thread's stack
+#                                     (flamegraph collapsed format on exit)
+#
+# The profiler samples the thread that called setup_from_env(), unless the
+# loop runs elsewhere: pass its thread_id (threading.get_ident() on that
+# thread), or ALL_THREADS for loops spread over several workers.
+
+import os
+
+from .core import Counter, Gauge, Histogram, Registry, LoopMetrics, REGISTRY
+from .export import Exporter, to_dict, to_prometheus, write
+from .profiler import ALL_THREADS, SamplingProfiler
+
+
+class Instrumentation:
+    """What setup_from_env() started; stop() flushes and shuts it down."""
+
+    def __init__(self, exporter=None, profiler=None, profile_path=None):
+        self.exporter = exporter
+        self.profiler = profiler
+        self.profile_path = profile_path
+
+    def stop(self):
+        if self.exporter is not None:
+            self.exporter.stop()
+        if self.profiler is not None:
+            self.profiler.stop()
+            self.profiler.write_collapsed(self.profile_path)
+
+
+def setup_from_env(registry=REGISTRY, thread_id=None):
+    path = os.environ.get("LAB_METRICS_FILE")
+    interval = float(os.environ.get("LAB_METRICS_INTERVAL", "5"))
+    profile_path = os.environ.get("LAB_PROFILE")
+
+    exporter = Exporter(path, interval, registry).start() if path else None
+    profiler = SamplingProfiler(thread_id=thread_id).start() if profile_path else None
+    return Instrumentation(exporter, profiler, profile_path)
@@ -0,0 +1,204 @@
+# core.py
+# Counters, gauges and HDR-style latency histograms cheap enough to sit in
+# the labs' hot loops (a record() is a few integer ops and a list increment,
+# no locks: each metric has one writer thread, readers just snapshot).
+
+import threading
+
+
+# Histogram layout: values are recorded in integer nanoseconds. The first
+# 2*SUB values get their own bucket; above that every power of two is split
+# into SUB linear sub-buckets -> worst-case relative error 1/SUB (~6%).
+SUB_BITS = 4
+SUB = 1 << SUB_BITS
+N_BUCKETS = 64 * SUB
+
+
+def bucket_index(v):
+    if v < 2 * SUB:
+        return v if v > 0 else 0
+    shift = v.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB + ((v >> shift) - SUB)
+
+
+def bucket_bounds(i):
+    """[low, high) in ns of bucket i."""
+    if i < 2 * SUB:
+        return i, i + 1
+    shift = i // SUB - 1
+    m = i % SUB + SUB
+    return m << shift, (m + 1) << shift
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help="", labels=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help="", labels=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.value = 0.0
+
+    def set(self, v):
+        self.value = v
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Histogram:
+    """Latency histogram; record() takes seconds."""
+    kind = "histogram"
+
+    def __init__(self, name, help="", labels=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds):
+        ns = int(seconds * 1e9)
+        if ns < 0:
+            ns = 0
+        i = bucket_index(ns)
+        if i >= N_BUCKETS:
+            i = N_BUCKETS - 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """Value (s) at percentile p in [0, 100]; bucket midpoint."""
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    low, high = bucket_bounds(i)
+                    return min(self.max, max(self.min, 0.5 * (low + high) * 1e-9))
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
+
+class Registry:
+    """All metrics of the process, keyed by (name, sorted labels)."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            m = self._metrics.get(key)
+            if m is None:
+                m = self._metrics[key] = cls(name, help, labels)
+            elif not isinstance(m, cls):
+                raise TypeError(f"metric {name} already registered as {m.kind}")
+            return m
+
+    def counter(self, name, help="", **labels):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", **labels):
+        return self._get(Histogram, name, help, labels)
+
+    def metrics(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+    def clear(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+REGISTRY = Registry()
+
+
+class LoopMetrics:
+    """
+    The standard set for one timing-critical loop, labelled loop=<name>:
+      loop_iterations_total
+      loop_period_seconds         time between tick()s
+      loop_io_seconds             time inside hardware calls (io())
+      loop_lateness_seconds       how far past its deadline an iteration ran
+      loop_deadline_misses_total  lateness > tolerance
+    """
+
+    def __init__(self, name, tolerance=None, registry=REGISTRY):
+        self.name = name
+        self.tolerance = tolerance
+        r = registry
+        self.iterations = r.counter("loop_iterations_total", "loop iterations", loop=name)
+        self.period = r.histogram("loop_period_seconds", "time between iterations", loop=name)
+        self.io_time = r.histogram("loop_io_seconds", "time in hardware I/O calls", loop=name)
+        self.lateness = r.histogram("loop_lateness_seconds", "actual - deadline", loop=name)
+        self.misses = r.counter("loop_deadline_misses_total", "lateness over tolerance", loop=name)
+        self._last = None
+
+    def tick(self, now):
+        self.iterations.value += 1
+        if self._last is not None:
+            self.period.record(now - self._last)
+        self._last = now
+
+    def io(self, seconds):
+        self.io_time.record(seconds)
+
+    def late(self, seconds):
+        self.lateness.record(seconds)
+        if self.tolerance is not None and seconds > self.tolerance:
+            self.misses.value += 1
+
+    def restart(self):
+        """Forget the last tick (e.g. between runs) so the gap isn't a period."""
+        self._last = None
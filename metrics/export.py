@@ -0,0 +1,93 @@
+# export.py
+# Snapshot a Registry to JSON or Prometheus text format, and a background
+# thread that rewrites the file every few seconds (written to a temp file
+# and renamed, so a reader never sees half a file). Point node_exporter's
+# textfile collector at the .prom file, or just `watch cat` the JSON.
+
+import json
+import os
+import threading
+import time
+
+from .core import REGISTRY
+
+
+def to_dict(registry=REGISTRY):
+    out = []
+    for m in registry.metrics():
+        out.append({
+            "name": m.name,
+            "type": m.kind,
+            "labels": m.labels,
+            **m.snapshot(),
+        })
+    return {"time": time.time(), "metrics": out}
+
+
+def _labels(labels, extra=None):
+    items = dict(labels)
+    if extra:
+        items.update(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(items.items())) + "}"
+
+
+def to_prometheus(registry=REGISTRY):
+    """Counters/gauges as-is, histograms as Prometheus summaries."""
+    lines = []
+    seen = set()
+    for m in sorted(registry.metrics(), key=lambda m: m.name):
+        if m.name not in seen:
+            seen.add(m.name)
+            kind = "summary" if m.kind == "histogram" else m.kind
+            if m.help:
+                lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {kind}")
+        if m.kind == "histogram":
+            for q, p in (("0.5", 50), ("0.9", 90), ("0.99", 99), ("0.999", 99.9)):
+                lines.append(f"{m.name}{_labels(m.labels, {'quantile': q})} {m.percentile(p):.9g}")
+            lines.append(f"{m.name}_sum{_labels(m.labels)} {m.total:.9g}")
+            lines.append(f"{m.name}_count{_labels(m.labels)} {m.count}")
+        else:
+            lines.append(f"{m.name}{_labels(m.labels)} {m.value:.9g}")
+    return "\n".join(lines) + "\n"
+
+
+def write(path, registry=REGISTRY):
+    """Write once; format from the extension (.prom -> Prometheus, else JSON)."""
+    if path.endswith(".prom"):
+        text = to_prometheus(registry)
+    else:
+        text = json.dumps(to_dict(registry), indent=1)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class Exporter:
+    def __init__(self, path, interval=5.0, registry=REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-export", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        # Event.wait uses the real clock even under the simulated backend
+        while not self._stop.wait(self.interval):
+            write(self.path, self.registry)
+
+    def stop(self):
+        """Stop and write a final snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        write(self.path, self.registry)
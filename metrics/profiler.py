@@ -0,0 +1,76 @@
+# profiler.py
+# Optional sampling profiler: a background thread looks at another thread's
+# current stack every `interval` s (sys._current_frames), so the profiled
+# loop pays nothing per call, unlike cProfile. Gives "where does the loop
+# spend its time" in flamegraph collapsed-stack format.
+#
+# thread_id=ALL_THREADS samples every thread instead (for loops spread over
+# worker threads); each stack then starts with the thread's name.
+
+import collections
+import sys
+import threading
+
+
+ALL_THREADS = "all"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.002, thread_id=None, max_depth=30):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.max_depth = max_depth
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id == ALL_THREADS:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in frames.items():
+                    if ident != me:
+                        self._sample(frame, names.get(ident, str(ident)))
+            else:
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self._sample(frame)
+
+    def _sample(self, frame, thread_name=None):
+        parts = []
+        while frame is not None and len(parts) < self.max_depth:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        if thread_name is not None:
+            parts.append(thread_name)
+        self.stacks[";".join(reversed(parts))] += 1
+        self.samples += 1
+
+    def top(self, n=10):
+        """[(leaf frame, fraction of samples)] for the n hottest leaf frames."""
+        leaves = collections.Counter()
+        for stack, c in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += c
+        total = max(1, self.samples)
+        return [(leaf, c / total) for leaf, c in leaves.most_common(n)]
+
+    def write_collapsed(self, path):
+        """One "frame;frame;frame count" line per stack (flamegraph.pl input)."""
+        with open(path, "w") as f:
+            for stack, c in self.stacks.most_common():
+                f.write(f"{stack} {c}\n")
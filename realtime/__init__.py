@@ -0,0 +1,11 @@
+# realtime - opt-in real-time setup for the labs' sampling loops.
+#
+# CPU pinning, SCHED_FIFO, mlockall, buffer prefaulting and GC freeze/disable
+# around one capture or generation run, restored afterwards; anything the
+# process isn't allowed to do is skipped (see RealtimeMode.describe()).
+# Enabled from the environment so default runs are unchanged:
+#   LAB_RT=1 LAB_RT_CPU=3 LAB_RT_PRIO=80 sudo -E python3 Control.py
+#
+#   python3 -m realtime.bench_jitter     # loop jitter with the mode off vs on
+
+from .mode import RealtimeMode, prefault, from_env
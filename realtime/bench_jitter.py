@@ -0,0 +1,111 @@
+# bench_jitter.py
+# Wake-up jitter of a periodic sampling loop with the real-time mode off
+# and on, under the kind of disturbances the lab loops see:
+#   - a large live heap (so a full GC pass costs milliseconds)
+#   - a little cyclic garbage per iteration (so the GC actually triggers)
+#   - a fresh sample buffer written for the first time inside the loop
+#   - optionally a CPU/allocation hog thread (--load)
+#
+# Each iteration waits for its absolute deadline t0 + k/rate (sleep like
+# Lab2, or --wait spin like Lab3) and records how late it woke up.
+#
+#   python3 -m realtime.bench_jitter                       (from the repo root)
+#   sudo python3 -m realtime.bench_jitter --cpu 3 --prio 80 --switch 0.0005 --load
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from metrics import Histogram
+from .mode import RealtimeMode
+
+
+def make_live_heap(n):
+    return [{"i": i, "s": str(i)} for i in range(n)]
+
+
+def hog(stop):
+    junk = []
+    while not stop.is_set():
+        junk.append([object() for _ in range(100)])
+        if len(junk) > 1000:
+            junk = []
+
+
+def run_loop(rate, seconds, wait, rt, tolerance):
+    n = int(rate * seconds)
+    period = 1.0 / rate
+    x = np.empty(n)              # first touched inside the loop unless prefaulted
+    late = Histogram("lateness")
+    misses = 0
+    with rt:
+        rt.prefault(x)
+        t0 = time.perf_counter() + 0.01
+        for k in range(n):
+            deadline = t0 + k * period
+            if wait == "spin":
+                while time.perf_counter() < deadline:
+                    pass
+            else:
+                remaining = deadline - time.perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
+            now = time.perf_counter()
+            late.record(now - deadline)
+            if now - deadline > tolerance:
+                misses += 1
+            x[k] = now
+            # per-iteration garbage, including a reference cycle
+            a = [k]
+            a.append(a)
+    return late, misses
+
+
+def fmt_us(s):
+    return f"{1e6 * s:9.1f}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sampling-loop wake-up jitter with the real-time mode off vs on")
+    ap.add_argument("--rate", type=float, default=2000.0, help="loop rate in Hz (Lab2: 2000, Lab3: 5000)")
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--wait", choices=("sleep", "spin"), default="sleep")
+    ap.add_argument("--cpu", type=int, default=None, help="core to pin to in the 'on' runs")
+    ap.add_argument("--prio", type=int, default=None, help="SCHED_FIFO priority in the 'on' runs")
+    ap.add_argument("--gc", choices=("freeze", "disable", "off"), default="freeze")
+    ap.add_argument("--no-mlock", action="store_true")
+    ap.add_argument("--switch", type=float, default=None, help="GIL switch interval (s) in the 'on' runs")
+    ap.add_argument("--heap", type=int, default=500_000, help="live objects kept around")
+    ap.add_argument("--load", action="store_true", help="run an allocation hog thread")
+    ap.add_argument("--repeat", type=int, default=2)
+    args = ap.parse_args()
+
+    heap = make_live_heap(args.heap)
+    stop = threading.Event()
+    if args.load:
+        threading.Thread(target=hog, args=(stop,), daemon=True).start()
+
+    modes = {
+        "off": RealtimeMode(enabled=False),
+        "on": RealtimeMode(cpu=args.cpu, priority=args.prio, lock=not args.no_mlock,
+                           gc=None if args.gc == "off" else args.gc, switch=args.switch),
+    }
+    tol = 0.5 / args.rate
+    print(f"{args.rate:.0f} Hz for {args.seconds:.1f} s, wait={args.wait}, "
+          f"{len(heap)} live objects, load={'yes' if args.load else 'no'}; "
+          f"miss = more than {1e6 * tol:.0f} us late")
+    print(f"{'mode':4s} {'run':>3s} {'p50 us':>9s} {'p99 us':>9s} {'p99.9 us':>9s} {'max us':>9s} {'misses':>7s}")
+    for rep in range(args.repeat):
+        for name, rt in modes.items():
+            h, misses = run_loop(args.rate, args.seconds, args.wait, rt, tol)
+            print(f"{name:4s} {rep:3d} {fmt_us(h.percentile(50))} {fmt_us(h.percentile(99))} "
+                  f"{fmt_us(h.percentile(99.9))} {fmt_us(h.max)} {misses:7d}")
+            if rep == 0 and name == "on":
+                print("     " + rt.describe())
+    stop.set()
+
+
+if __name__ == "__main__":
+    main()
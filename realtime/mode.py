@@ -0,0 +1,197 @@
+# mode.py
+# Opt-in "real-time" setup for a timing-critical loop, undone afterwards:
+#
+#   cpu        pin the calling thread to these core(s)   (sched_setaffinity)
+#   priority   SCHED_FIFO at this priority, 1..99       (sched_setscheduler)
+#   lock       mlockall(current + future) so no page faults mid-loop
+#   gc         "freeze": collect, then move every live object out of the
+#                        GC's reach (later collections only scan new objects)
+#              "disable": collect + freeze + no automatic GC at all
+#              None: leave the GC alone
+#   switch     sys.setswitchinterval(): how long another Python thread may
+#              hold the GIL before the loop thread gets it back (default 5 ms)
+#
+# Every step that is refused (not root, no CAP_SYS_NICE, RLIMIT_MEMLOCK too
+# small, not Linux) is recorded in .failed and skipped, so the loop still
+# runs, just without that guarantee. Affinity and priority apply to the
+# calling thread only; the GC and memory locking are process-wide, so use
+# one RealtimeMode at a time.
+#
+#   rt = RealtimeMode(cpu=3, priority=80, lock=True, gc="freeze")
+#   x = np.empty(n)
+#   with rt:
+#       rt.prefault(x)
+#       ... sampling loop ...
+#   print(rt.describe())
+
+import ctypes
+import ctypes.util
+import gc
+import mmap
+import os
+import sys
+
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+GC_MODES = (None, "freeze", "disable")
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    return _libc
+
+
+def prefault(buf):
+    """Touch one byte per page of a writable buffer (numpy array, bytearray)
+    so the kernel maps it now, not on the first write inside the loop.
+    Contents are unchanged."""
+    b = memoryview(buf).cast("B")
+    for i in range(0, len(b), mmap.PAGESIZE):
+        b[i] = b[i]
+    return buf
+
+
+class RealtimeMode:
+    def __init__(self, cpu=None, priority=None, lock=False, gc="freeze", switch=None,
+                 enabled=True):
+        if gc not in GC_MODES:
+            raise ValueError(f"gc must be one of {GC_MODES}")
+        if isinstance(cpu, int):
+            cpu = {cpu}
+        self.cpu = set(cpu) if cpu is not None else None
+        self.priority = priority
+        self.lock = lock
+        self.gc = gc
+        self.switch = switch
+        self.enabled = enabled
+        self.applied = []
+        self.failed = {}
+        self._undo = []
+        self._active = False
+
+    # --- context manager ------------------------------------------------
+    def __enter__(self):
+        if self._active:
+            raise RuntimeError("RealtimeMode is not re-entrant")
+        self._active = True
+        self.applied = []
+        self.failed = {}
+        self._undo = []
+        if self.enabled:
+            if self.cpu is not None:
+                self._try("affinity", self._set_affinity)
+            if self.priority is not None:
+                self._try("sched_fifo", self._set_fifo)
+            if self.lock:
+                self._try("mlockall", self._lock_memory)
+            if self.gc is not None:
+                self._try("gc_" + self.gc, self._set_gc)
+            if self.switch is not None:
+                self._try("switchinterval", self._set_switch)
+        return self
+
+    def __exit__(self, *exc):
+        # undo in reverse order; a failed restore must not hide the others
+        while self._undo:
+            name, fn = self._undo.pop()
+            try:
+                fn()
+            except OSError as e:
+                self.failed["restore_" + name] = str(e)
+        self._active = False
+        return False
+
+    def prefault(self, *buffers):
+        """prefault() the loop's buffers; no-op when the mode is disabled."""
+        if self.enabled:
+            for buf in buffers:
+                prefault(buf)
+
+    def describe(self):
+        if not self.enabled:
+            return "realtime: off"
+        parts = list(self.applied)
+        parts += [f"{name} FAILED ({why})" for name, why in self.failed.items()]
+        return "realtime: " + (", ".join(parts) if parts else "nothing requested")
+
+    # --- steps ------------------------------------------------------------
+    def _try(self, name, fn):
+        try:
+            undo = fn()
+        except (OSError, AttributeError, ValueError) as e:
+            # AttributeError: os.sched_* missing (not Linux)
+            self.failed[name] = str(e) or type(e).__name__
+            return
+        self.applied.append(name)
+        if undo is not None:
+            self._undo.append((name, undo))
+
+    def _set_affinity(self):
+        old = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, self.cpu)
+        return lambda: os.sched_setaffinity(0, old)
+
+    def _set_fifo(self):
+        old_policy = os.sched_getscheduler(0)
+        old_param = os.sched_getparam(0)
+        lo = os.sched_get_priority_min(os.SCHED_FIFO)
+        hi = os.sched_get_priority_max(os.SCHED_FIFO)
+        prio = min(hi, max(lo, self.priority))
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(prio))
+        return lambda: os.sched_setscheduler(0, old_policy, old_param)
+
+    def _lock_memory(self):
+        libc = _get_libc()
+        if libc.mlockall(MCL_CURRENT | MCL_FUTURE) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        return libc.munlockall
+
+    def _set_gc(self):
+        was_enabled = gc.isenabled()
+        gc.collect()
+        gc.freeze()
+        if self.gc == "disable":
+            gc.disable()
+
+        def undo():
+            gc.unfreeze()
+            if was_enabled:
+                gc.enable()
+        return undo
+
+    def _set_switch(self):
+        old = sys.getswitchinterval()
+        sys.setswitchinterval(self.switch)
+        return lambda: sys.setswitchinterval(old)
+
+
+def from_env(environ=None):
+    """
+    RealtimeMode configured from the environment, disabled unless LAB_RT=1:
+      LAB_RT_CPU=3        core(s) to pin to, e.g. "3" or "2,3"
+      LAB_RT_PRIO=80      SCHED_FIFO priority (unset: keep normal scheduling)
+      LAB_RT_MLOCK=1      mlockall (default 1)
+      LAB_RT_GC=freeze    freeze | disable | off (default freeze)
+      LAB_RT_SWITCH=0.0005  GIL switch interval in s (unset: unchanged)
+    """
+    env = os.environ if environ is None else environ
+    enabled = env.get("LAB_RT", "0") not in ("", "0")
+    cpu = env.get("LAB_RT_CPU")
+    prio = env.get("LAB_RT_PRIO")
+    gc_mode = env.get("LAB_RT_GC", "freeze")
+    switch = env.get("LAB_RT_SWITCH")
+    return RealtimeMode(
+        cpu={int(c) for c in cpu.split(",")} if cpu else None,
+        priority=int(prio) if prio else None,
+        lock=env.get("LAB_RT_MLOCK", "1") not in ("", "0"),
+        gc=None if gc_mode == "off" else gc_mode,
+        switch=float(switch) if switch else None,
+        enabled=enabled,
+    )